@@ -1,12 +1,32 @@
 import discord
 from discord import app_commands
 import os
+import asyncio
 import aiohttp
 import json
 import base64
+import copy
+import contextlib
+import csv
+import hashlib
+import inspect
 import uuid
-from io import BytesIO
+import time
+import heapq
+import math
+import bisect
+import itertools
+import random
+import signal
+import sqlite3
+import threading
+import tempfile
+from io import BytesIO, TextIOWrapper
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 from datetime import datetime, timezone, timedelta
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -15,7 +35,31 @@ from datetime import datetime, timezone, timedelta
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-client = discord.Client(intents=intents)
+
+
+class B4C0NClient(discord.Client):
+    async def setup_hook(self):
+        try:
+            await storage.open()
+        except Exception as ex:
+            print(f'⚠️  Fitness storage failed to open: {ex}')
+        load_quote_bubble()
+        if DIGEST_CHANNEL_ID:
+            self.digest_task = asyncio.create_task(weekly_digest_loop())
+        self.reminder_task = asyncio.create_task(goal_reminders.run())
+        # Dyno restarts send SIGTERM; close cleanly so pending writes drain.
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:   # Windows
+            pass
+
+    async def close(self):
+        await storage.close()
+        await close_http_session()
+        await super().close()
+
+
+client = B4C0NClient(intents=intents)
 tree = app_commands.CommandTree(client)
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -23,11 +67,21 @@ tree = app_commands.CommandTree(client)
 # ═══════════════════════════════════════════════════════════════════════════════
 QUOTES_CHANNEL_ID   = int(os.getenv('QUOTES_CHANNEL_ID', '0'))
 SPEECH_BUBBLE_IMAGE = os.getenv('SPEECH_BUBBLE_IMAGE', '')
+SPEECH_BUBBLE_PATH  = os.getenv('SPEECH_BUBBLE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images', 'BUB.png'))
 GITHUB_TOKEN        = os.getenv('GITHUB_TOKEN', '')
 FITNESS_ROLE_ID     = int(os.getenv('FITNESS_ROLE_ID', '0'))
+DIGEST_CHANNEL_ID   = int(os.getenv('FITNESS_DIGEST_CHANNEL_ID', '0'))   # weekly recaps; 0 = off
 
-GITHUB_REPO      = 'Digital-Void-divo/B4C0N'
-GITHUB_FILE_PATH = 'Fitness/b4c0nFitness.json'
+GITHUB_REPO       = 'Digital-Void-divo/B4C0N'
+GITHUB_FILE_PATH  = 'Fitness/b4c0nFitness.json'   # legacy single-file layout (migration source)
+GITHUB_USERS_DIR  = 'Fitness/users'               # one shard per member: <uid>.json
+GITHUB_INDEX_PATH = 'Fitness/index.json'          # uid → username / is_public / joined
+GITHUB_BOARD_PATH = 'Fitness/leaderboard.json'    # uid → leaderboard row (board_row), rewritten on a timer
+
+# Storage backend: 'github' (shards in GITHUB_REPO) or 'sqlite' (local file)
+FITNESS_BACKEND       = os.getenv('FITNESS_BACKEND', 'github').lower()
+FITNESS_SQLITE_PATH   = os.getenv('FITNESS_SQLITE_PATH', 'fitness.db')
+FITNESS_SQLITE_IMPORT = os.getenv('FITNESS_SQLITE_IMPORT', '')   # JSON document loaded into an empty DB
 
 # Stat fields: key → display label + goal direction
 GOAL_FIELDS: dict[str, dict] = {
@@ -45,40 +99,663 @@ STAT_FIELDS_P2 = ['resting_heart_rate', 'bench', 'cardio_duration']
 
 WORKOUT_CATEGORIES = ['Strength', 'Cardio', 'Flexibility', 'Sport', 'Other']
 PAGE_SIZE = 5
+MILESTONE_BURST_MAX = 5      # more milestones than this from one stat update share a single summary line
+MILESTONE_PCT_MIN   = 0.01   # allowed milestone steps, in percent of the way to a goal
+MILESTONE_PCT_MAX   = 100.0
+
+# /fittrends
+TREND_ROLLING_N  = 4    # entries in the rolling average
+TREND_FIT_DAYS   = 90   # least-squares fit over this much recent history
+TREND_MIN_POINTS = 3    # per field, inside the fit window
+
+# /fitleaderboard
+LEADERBOARD_WEEKS = 4    # workouts/week is averaged over this many weeks
+LEADERBOARD_SIZE  = 10
+LEADERBOARD_FLUSH_S = float(os.getenv('FITNESS_LEADERBOARD_FLUSH_S', '900'))   # rows are committed at most this often
+
+# Progress charts: rendered off the event loop, cached by content hash
+CHART_CACHE_BYTES = int(os.getenv('CHART_CACHE_BYTES', str(16 * 1024 * 1024)))
+CHART_THREADS     = 2
+CHART_PANEL_SIZE  = (380, 210)
+CHART_FILENAME    = 'progress.png'
+
+# Quote assets: downloaded bytes and decoded images (masked avatars, sized bubbles)
+QUOTE_ASSET_CACHE_BYTES = int(os.getenv('QUOTE_ASSET_CACHE_BYTES', str(32 * 1024 * 1024)))
+QUOTE_AVATAR_SIZE       = 120
+QUOTE_AVATAR_FETCH_SIZE = 256   # Discord serves avatars at powers of two; the smallest ≥ QUOTE_AVATAR_SIZE
+
+# Quote rendering: Pillow work runs on its own threads, never the event loop
+QUOTE_RENDER_THREADS = int(os.getenv('QUOTE_RENDER_THREADS', '2'))
+QUOTE_QUEUE_MAX      = int(os.getenv('QUOTE_QUEUE_MAX', '8'))   # quotes in progress at once; more are turned away
+
+# /fitimport: attachments are streamed to a temp file, then parsed row by row
+IMPORT_MAX_BYTES = 5 * 1024 * 1024
+IMPORT_MAX_ROWS  = 20000
+IMPORT_ERRORS_SHOWN = 10
+
+# Weekly digest: posted Sundays at DIGEST_HOUR_UTC for the week just ended
+DIGEST_HOUR_UTC           = int(os.getenv('FITNESS_DIGEST_HOUR_UTC', '17'))
+DIGEST_EMBEDS_PER_MESSAGE = 10     # Discord's cap
+DIGEST_LOAD_CONCURRENCY   = 4      # member records fetched at once while gathering a digest
+DISCORD_SEND_INTERVAL_S   = 1.5    # channel sends are paced to stay under 5 per 5 s
+
+# Goal reminders: DM'd this many days before a goal's target_date, at REMINDER_HOUR_UTC
+REMINDER_OFFSETS_DAYS = sorted({int(d) for d in os.getenv('FITNESS_REMINDER_DAYS', '30,7,1').split(',') if d.strip()},
+                               reverse=True)
+REMINDER_HOUR_UTC     = int(os.getenv('FITNESS_REMINDER_HOUR_UTC', '15'))
+REMINDER_GRACE_S      = 12 * 3600   # a reminder missed by less than this (e.g. a restart) still goes out
+
+# Outbound HTTP pool — shared by GitHub I/O and quote asset downloads
+HTTP_POOL_LIMIT      = int(os.getenv('HTTP_POOL_LIMIT', '50'))
+HTTP_PER_HOST_LIMIT  = int(os.getenv('HTTP_PER_HOST_LIMIT', '10'))
+HTTP_KEEPALIVE_S     = 60
+HTTP_DNS_CACHE_TTL_S = 300
+HTTP_TIMEOUT         = aiohttp.ClientTimeout(total=30, connect=5, sock_read=20)
+
+# Fitness commands defer at once and fill in afterwards; Discord fails any
+# interaction not acknowledged within COMMAND_ACK_BUDGET_S
+COMMAND_ACK_BUDGET_S = 3.0
+COMMAND_LATENCY_KEEP = 500   # recent samples kept per command
+
+# Write-behind: edits are committed together once per window or per N edits
+FLUSH_WINDOW_S    = float(os.getenv('FITNESS_FLUSH_WINDOW_S', '2'))
+FLUSH_MAX_PENDING = int(os.getenv('FITNESS_FLUSH_MAX_PENDING', '20'))
+FLUSH_RETRY_MAX_S = 60.0
+SAVE_ATTEMPTS     = 5     # per commit, across sha conflicts and transient errors
+SAVE_BACKOFF_S    = 0.5   # full-jitter base: sleep U(0, base·2^attempt)
+
+# GitHub API scheduling: lower number = served first
+PRIORITY_READ, PRIORITY_WRITE, PRIORITY_BACKGROUND = 0, 1, 2
+GITHUB_MAX_INFLIGHT    = 4
+GITHUB_RESERVE         = {PRIORITY_READ: 0, PRIORITY_WRITE: 50, PRIORITY_BACKGROUND: 300}   # hourly budget kept back for higher priorities
+GITHUB_READ_WAIT_MAX_S = 8.0    # interactive reads fall back to cache / an error rather than wait longer
+GITHUB_LIMITED_RETRIES = 6      # per request, across 429s and secondary-limit 403s
+SECONDARY_BACKOFF_S    = 60.0   # GitHub's advice when a secondary limit gives no Retry-After
+
+# Journal: edits append events to <uid>.journal.jsonl; compaction folds them
+# back into the member's shard once the journal is this big, or on the timer
+JOURNAL_COMPACT_EVENTS     = int(os.getenv('FITNESS_JOURNAL_COMPACT_EVENTS', '50'))
+JOURNAL_COMPACT_BYTES      = 64 * 1024
+JOURNAL_COMPACT_INTERVAL_S = float(os.getenv('FITNESS_JOURNAL_COMPACT_INTERVAL_S', str(6 * 3600)))
+
+# Local write-ahead log: journal events are fsync'd here before the edit is
+# acknowledged, and only dropped once GitHub has them
+FITNESS_WAL_PATH       = os.getenv('FITNESS_WAL_PATH', 'fitness.wal.jsonl')
+SHUTDOWN_DRAIN_S       = 20.0   # Heroku allows 30 s between SIGTERM and SIGKILL
+STORAGE_OPEN_BACKOFF_S = 2.0    # GitHub connect retries back off from here…
+STORAGE_OPEN_MAX_S     = 300.0  # …up to this
+
+# Hot/cold tiering: stats and workouts older than this leave the member's
+# record for per-year archive files, fetched only when history reaches them
+ARCHIVE_HORIZON_DAYS = int(os.getenv('FITNESS_ARCHIVE_DAYS', '365'))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  HTTP Session
+# ═══════════════════════════════════════════════════════════════════════════════
+_http: aiohttp.ClientSession | None = None
+
+
+def http_session() -> aiohttp.ClientSession:
+    """
+    Return the process-wide ClientSession. Opened in on_ready and closed with
+    the client; created lazily here too in case a call races startup.
+    """
+    global _http
+    if _http is None or _http.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE_S,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL_S,
+        )
+        _http = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+    return _http
+
+
+async def close_http_session():
+    global _http
+    if _http is not None and not _http.closed:
+        await _http.close()
+    _http = None
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  GitHub I/O
 # ═══════════════════════════════════════════════════════════════════════════════
-async def gh_load() -> tuple[dict, str | None]:
-    url = f'https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}'
-    headers = {
+def gh_headers() -> dict:
+    return {
         'Authorization': f'token {GITHUB_TOKEN}',
         'Accept': 'application/vnd.github.v3+json',
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as resp:
-            if resp.status == 404:
-                return {'users': {}}, None
-            if resp.status != 200:
-                raise Exception(f'GitHub read failed: HTTP {resp.status}')
-            payload = await resp.json()
-            content = base64.b64decode(payload['content']).decode('utf-8')
-            return json.loads(content), payload['sha']
 
 
-async def gh_save(data: dict, sha: str | None, message: str = 'Update fitness data') -> bool:
-    url = f'https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_FILE_PATH}'
-    headers = {
-        'Authorization': f'token {GITHUB_TOKEN}',
-        'Accept': 'application/vnd.github.v3+json',
+class FitnessSaveError(Exception):
+    """An edit could not be committed; the message is safe to show the member."""
+
+
+class FitnessUnavailable(Exception):
+    """Storage hasn't connected (yet); the message is safe to show the member."""
+
+
+class GitHubRateLimited(Exception):
+    """GitHub is out of budget for this request; the message is safe to show the member."""
+
+
+class GitHubClient:
+    """
+    Every GitHub API call goes through request(). Calls wait for one of
+    max_inflight slots, handed out strictly by priority: interactive reads,
+    then member writes, then background work. The X-RateLimit-* headers
+    keep a running budget; each priority leaves GITHUB_RESERVE of it to the
+    ones above, and a 429 / secondary-limit 403 pauses everything until its
+    Retry-After (or reset) has passed.
+    """
+    def __init__(self, max_inflight: int):
+        self.max_inflight = max_inflight
+        self.inflight     = 0
+        self.remaining:   int | None = None
+        self.limit:       int | None = None
+        self.reset_at     = 0.0   # epoch seconds
+        self.paused_until = 0.0   # epoch seconds
+        self._waiting:    list[tuple[int, int, asyncio.Future]] = []   # heap of (priority, seq, slot)
+        self._seq         = itertools.count()
+        self._wakeup:     asyncio.TimerHandle | None = None
+        self._secondary   = 0     # consecutive secondary-limit hits, for backoff
+
+    def _blocked_for(self, priority: int) -> float:
+        """Seconds until priority may send another request (0 = now)."""
+        now  = time.time()
+        wait = self.paused_until - now
+        if self.remaining is not None and self.remaining <= GITHUB_RESERVE[priority]:
+            wait = max(wait, self.reset_at - now)
+        return max(wait, 0.0)
+
+    def _dispatch(self):
+        while self._waiting and self.inflight < self.max_inflight:
+            priority, _, slot = self._waiting[0]
+            if slot.done():   # gave up waiting
+                heapq.heappop(self._waiting)
+                continue
+            wait = self._blocked_for(priority)
+            if wait:
+                if self._wakeup is None:
+                    self._wakeup = asyncio.get_running_loop().call_later(wait, self._wake)
+                return
+            heapq.heappop(self._waiting)
+            self.inflight += 1
+            if self.remaining is not None:
+                self.remaining -= 1
+            slot.set_result(None)
+
+    def _wake(self):
+        self._wakeup = None
+        self._dispatch()
+
+    async def _acquire(self, priority: int):
+        slot = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._seq), slot))
+        self._dispatch()
+        if priority != PRIORITY_READ:
+            await slot
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(slot), GITHUB_READ_WAIT_MAX_S)
+        except asyncio.TimeoutError:
+            if slot.done():   # granted just as we gave up
+                self._release()
+            slot.cancel()
+            wait = self._blocked_for(priority)
+            raise GitHubRateLimited(
+                f'GitHub is rate-limiting the bot; try again in about {max(1, round(wait / 60))} min.'
+                if wait else 'GitHub is busy right now; try again in a moment.'
+            )
+
+    def _release(self):
+        self.inflight -= 1
+        self._dispatch()
+
+    def _observe(self, status: int, headers, text: str) -> bool:
+        """Update the budget from a response; True if it was a rate-limit refusal."""
+        if 'X-RateLimit-Remaining' in headers:
+            self.remaining = int(headers['X-RateLimit-Remaining'])
+            self.limit     = int(headers.get('X-RateLimit-Limit', self.limit or 0))
+            self.reset_at  = float(headers.get('X-RateLimit-Reset', self.reset_at))
+        if status not in (403, 429):
+            self._secondary = 0
+            return False
+        if headers.get('Retry-After'):
+            pause = float(headers['Retry-After'])
+        elif headers.get('X-RateLimit-Remaining') == '0':
+            pause = self.reset_at - time.time()
+        elif 'rate limit' in text.lower():
+            pause = SECONDARY_BACKOFF_S * 2 ** self._secondary
+            self._secondary += 1
+        else:
+            return False   # a genuine permission error
+        self.paused_until = max(self.paused_until, time.time() + max(pause, 1.0))
+        print(f'⏳ GitHub rate limit hit; pausing API calls for {max(pause, 1.0):.0f}s')
+        return True
+
+    async def request(self, method: str, url: str, priority: int, *, headers: dict,
+                      json: dict | None = None, raw: bool = False) -> tuple[int, dict, object]:
+        """
+        → (status, headers, body). body is the parsed JSON (the text when raw)
+        for a 2xx, else None. Raises GitHubRateLimited when an interactive read
+        can't get a slot within GITHUB_READ_WAIT_MAX_S.
+        """
+        for _ in range(GITHUB_LIMITED_RETRIES):
+            await self._acquire(priority)
+            try:
+                async with http_session().request(method, url, headers=headers, json=json) as resp:
+                    status = resp.status
+                    if 200 <= status < 300:
+                        body = await resp.text() if raw else await resp.json()
+                        self._observe(status, resp.headers, '')
+                        return status, resp.headers, body
+                    text = await resp.text() if status in (403, 429) else ''
+                    if not self._observe(status, resp.headers, text):
+                        return status, resp.headers, None
+            finally:
+                self._release()
+        return status, resp.headers, None
+
+    def status(self) -> dict:
+        queued = [0, 0, 0]
+        for priority, _, slot in self._waiting:
+            if not slot.done():
+                queued[priority] += 1
+        return {
+            'remaining':    self.remaining,
+            'limit':        self.limit,
+            'reset_in_s':   max(self.reset_at - time.time(), 0.0) if self.remaining is not None else None,
+            'paused_for_s': max(self.paused_until - time.time(), 0.0),
+            'inflight':     self.inflight,
+            'queued':       dict(zip(('read', 'write', 'background'), queued)),
+        }
+
+
+github = GitHubClient(GITHUB_MAX_INFLIGHT)
+
+
+def gh_contents_url(path: str) -> str:
+    return f'https://api.github.com/repos/{GITHUB_REPO}/contents/{path}'
+
+
+def user_path(uid: str) -> str:
+    return f'{GITHUB_USERS_DIR}/{uid}.json'
+
+
+def journal_path(uid: str) -> str:
+    return f'{GITHUB_USERS_DIR}/{uid}.journal.jsonl'
+
+
+def archive_path(uid: str, year: int) -> str:
+    return f'{GITHUB_USERS_DIR}/{uid}.archive.{year}.json'
+
+
+def decode_file(path: str, text: str) -> dict:
+    """Parse a repo file; a .jsonl journal becomes {'events': [...]}."""
+    if path.endswith('.jsonl'):
+        return {'events': [json.loads(line) for line in text.splitlines() if line.strip()]}
+    return json.loads(text)
+
+
+def encode_file(path: str, data: dict) -> str:
+    if path.endswith('.jsonl'):
+        return ''.join(json.dumps(e, separators=(',', ':')) + '\n' for e in data['events'])
+    return json.dumps(data, indent=2)
+
+
+class CachedFile:
+    """
+    Last known copy of one repo file plus the sha/ETag it was read at.
+    gh_load revalidates it with If-None-Match, so an unchanged file costs a
+    304 instead of a full download + decode + parse. base_text is the file
+    exactly as GitHub last had it — the common ancestor for merges.
+    """
+    def __init__(self, path: str):
+        self.path                   = path
+        self.data:      dict | None = None
+        self.sha:       str | None  = None
+        self.etag:      str | None  = None
+        self.base_text: str | None  = None
+        self.version:   int         = 0   # bumped on every local edit
+
+    def base(self):
+        return decode_file(self.path, self.base_text) if self.base_text is not None else _MISSING
+
+
+file_cache: dict[str, CachedFile] = {}
+
+
+async def gh_fetch(path: str, etag: str | None = None,
+                   priority: int = PRIORITY_READ) -> tuple[int, str | None, str | None, str | None]:
+    """Raw GET of one file → (status, text, sha, etag). text is None unless status is 200."""
+    headers = gh_headers()
+    if etag:
+        headers['If-None-Match'] = etag
+    status, resp_headers, payload = await github.request('GET', gh_contents_url(path), priority, headers=headers)
+    if status != 200:
+        return status, None, None, None
+    etag = resp_headers.get('ETag')
+    if payload.get('encoding') == 'base64':
+        return 200, base64.b64decode(payload['content']).decode('utf-8'), payload['sha'], etag
+    # Above 1 MB the contents API stops inlining the file; read the blob raw.
+    blob_url = f'https://api.github.com/repos/{GITHUB_REPO}/git/blobs/{payload["sha"]}'
+    headers  = {**gh_headers(), 'Accept': 'application/vnd.github.raw'}
+    status, _, text = await github.request('GET', blob_url, priority, headers=headers, raw=True)
+    if status != 200:
+        return status, None, None, None
+    return 200, text, payload['sha'], etag
+
+
+_loading: dict[tuple[str, bool], asyncio.Task] = {}   # (path, interactive) → the in-flight gh_load
+
+
+async def gh_load(path: str, priority: int = PRIORITY_READ) -> dict | None:
+    """
+    Return the live cached copy of path, or None if the file doesn't exist.
+    Read it, or edit it through the GitHubStore; never mutate it directly.
+    While GitHub is rate-limiting us a previously read copy is served as is.
+    Concurrent loads of one path share a single request, but interactive
+    reads never join background work: that request waits for a slot with no
+    time limit and no cached fallback, possibly until the rate-limit reset.
+    """
+    key  = (path, priority == PRIORITY_READ)
+    task = _loading.get(key)
+    if task is None:
+        task = _loading[key] = asyncio.create_task(_gh_load(path, priority))
+        task.add_done_callback(lambda _: _loading.pop(key, None))
+    # Shielded so one caller giving up doesn't cancel the load for the rest.
+    return await asyncio.shield(task)
+
+
+async def _gh_load(path: str, priority: int) -> dict | None:
+    entry = file_cache.get(path) or file_cache.setdefault(path, CachedFile(path))
+    # Unflushed edits make the in-memory copy newer than GitHub's.
+    if path in write_behind.pending:
+        return entry.data
+    version = entry.version
+    try:
+        status, text, sha, etag = await gh_fetch(path, entry.etag if entry.data is not None else None, priority)
+    except GitHubRateLimited:
+        if entry.base_text is None and entry.data is None:
+            raise
+        return entry.data
+    if status == 304:
+        return entry.data
+    if status not in (200, 404):
+        raise Exception(f'GitHub read failed: HTTP {status}')
+    # An edit landed while we were waiting on GitHub; keep the local copy.
+    if entry.version != version or path in write_behind.pending:
+        return entry.data
+    entry.data      = decode_file(path, text) if text is not None else None
+    entry.sha       = sha
+    entry.etag      = etag
+    entry.base_text = text
+    return entry.data
+
+
+_MISSING = object()
+_LIST_ITEM_KEYS = ('id', 'recorded_at', 'logged_at', 'week_start')
+
+
+class _Unmergeable(Exception):
+    pass
+
+
+def _item_key(item) -> tuple:
+    if isinstance(item, dict):
+        for k in _LIST_ITEM_KEYS:
+            if k in item:
+                return k, item[k]
+    return 'json', json.dumps(item, sort_keys=True)
+
+
+def merge3(base, ours, theirs):
+    """
+    Three-way merge of two edits of the same JSON value. Dicts merge per key;
+    lists merge per item, keyed by id / timestamp / week so both sides'
+    appends survive. Raises _Unmergeable when both sides changed the same
+    scalar differently. _MISSING stands for an absent key or file.
+    """
+    if ours == theirs:
+        return ours
+    if base == ours:
+        return theirs
+    if base == theirs:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        b   = base if isinstance(base, dict) else {}
+        out = {}
+        for k in list(ours) + [k for k in theirs if k not in ours]:
+            v = merge3(b.get(k, _MISSING), ours.get(k, _MISSING), theirs.get(k, _MISSING))
+            if v is not _MISSING:
+                out[k] = v
+        return out
+    if isinstance(ours, list) and isinstance(theirs, list):
+        b = {_item_key(i): i for i in (base if isinstance(base, list) else [])}
+        o = {_item_key(i): i for i in ours}
+        t = {_item_key(i): i for i in theirs}
+        out = []
+        for k in list(t) + [k for k in o if k not in t]:
+            v = merge3(b.get(k, _MISSING), o.get(k, _MISSING), t.get(k, _MISSING))
+            if v is not _MISSING:
+                out.append(v)
+        # stats[-1] is "latest" everywhere, so time-ordered lists stay ordered.
+        for ts in ('recorded_at', 'logged_at'):
+            if out and all(isinstance(i, dict) and ts in i for i in out):
+                out.sort(key=lambda i: i[ts])
+        return out
+    raise _Unmergeable
+
+
+def merge_index(base, ours, theirs):
+    """
+    Index entries are only ever written by their own member's edits, and the
+    member's shard is the source of truth, so on a clash our entry wins.
+    """
+    bu = base.get('users', {}) if isinstance(base, dict) else {}
+    ou = ours.get('users', {})
+    tu = theirs.get('users', {})
+    users: dict = {}
+    for uid in list(tu) + [u for u in ou if u not in tu]:
+        try:
+            v = merge3(bu.get(uid, _MISSING), ou.get(uid, _MISSING), tu.get(uid, _MISSING))
+        except _Unmergeable:
+            v = ou[uid]
+        if v is not _MISSING:
+            users[uid] = v
+    return {**theirs, **ours, 'users': users}
+
+
+def merge_ours(base, ours, theirs):
+    """For files derived from the shards and written only by us (the leaderboard): ours wins."""
+    return ours
+
+
+async def gh_save(path: str, message: str, merge=merge3, priority: int = PRIORITY_WRITE) -> bool:
+    """
+    Commit the cached copy of path. A stale sha (409/422) triggers a reload
+    and a three-way merge onto GitHub's version, then another attempt;
+    transient failures retry with jittered backoff. Raises FitnessSaveError
+    (after resetting the cache to GitHub's version) when the merge is
+    impossible; returns False when GitHub keeps refusing.
+    """
+    entry = file_cache[path]
+    url   = gh_contents_url(path)
+    for attempt in range(SAVE_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(random.uniform(0, SAVE_BACKOFF_S * 2 ** attempt))
+        text    = encode_file(path, entry.data)
+        payload = {
+            'message': message,
+            'content': base64.b64encode(text.encode()).decode(),
+            'branch':  'main',
+        }
+        if entry.sha:
+            payload['sha'] = entry.sha
+        try:
+            status, _, result = await github.request('PUT', url, priority, headers=gh_headers(), json=payload)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            continue
+        if result is not None:
+            # The PUT response carries the new blob sha but no ETag for the
+            # GET representation, so the next load does one full read.
+            entry.sha, entry.etag, entry.base_text = result['content']['sha'], None, text
+            return True
+        if status not in (409, 422):
+            if status < 500 and status not in (403, 429):
+                return False
+            continue
+        status, their_text, their_sha, _ = await gh_fetch(path, priority=priority)
+        if their_text is None:
+            continue
+        theirs = decode_file(path, their_text)
+        try:
+            merged = merge(entry.base(), entry.data, theirs)
+        except _Unmergeable:
+            merged = None
+        entry.sha, entry.etag, entry.base_text = their_sha, None, their_text
+        if merged is None:
+            entry.data = theirs
+            raise FitnessSaveError(
+                'Your profile was changed somewhere else at the same time. '
+                'Please reopen it and try again.'
+            )
+        entry.data = merged
+        if merged == theirs:
+            return True
+    return False
+
+
+class WriteBehindQueue:
+    """
+    Coalesces edits into one GitHub commit per file per FLUSH_WINDOW_S
+    seconds, or sooner once FLUSH_MAX_PENDING edits pile up. Edits are
+    visible to every reader immediately. Each edit's future resolves to True
+    once its commit lands, or raises FitnessSaveError if it can't be merged;
+    a commit GitHub refuses stays queued and is retried with backoff, its
+    futures still unresolved.
+    """
+    def __init__(self, window_s: float, max_pending: int):
+        self.window_s    = window_s
+        self.max_pending = max_pending
+        self.pending:  dict[str, list[tuple[str, asyncio.Future]]] = {}   # path → [(message, saved)]
+        self._kick     = asyncio.Event()
+        self._lock     = asyncio.Lock()
+        self._task:    asyncio.Task | None = None
+        self._retry_s  = 0.0
+
+    def mark_dirty(self, path: str, message: str) -> asyncio.Future:
+        file_cache[path].version += 1
+        saved = asyncio.get_running_loop().create_future()
+        self.pending.setdefault(path, []).append((message, saved))
+        # While backing off after a failure, a full queue waits like the rest.
+        if not self._retry_s and self.waiting() >= self.max_pending:
+            self._kick.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+        return saved
+
+    def waiting(self) -> int:
+        """Edits not yet committed."""
+        return sum(not saved.done() for edits in self.pending.values() for _, saved in edits)
+
+    async def _flush_later(self):
+        delay = max(self.window_s, self._retry_s)
+        try:
+            await asyncio.wait_for(self._kick.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        ok = await self.flush()
+        # Edits queued while this task was flushing saw it still running and
+        # didn't schedule their own, so pick them up here.
+        if self.pending:
+            if not ok:
+                self._retry_s = min(max(self._retry_s * 2, self.window_s), FLUSH_RETRY_MAX_S)
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> bool:
+        """Commit everything pending now. Returns False if GitHub rejected any of it."""
+        async with self._lock:
+            if not self.pending:
+                return True
+            batch, self.pending = self.pending, {}
+            self._kick.clear()
+            results = await asyncio.gather(*(self._commit(p, edits) for p, edits in batch.items()))
+            if all(results):
+                self._retry_s = 0.0
+            return all(results)
+
+    async def _commit(self, path: str, edits: list[tuple[str, asyncio.Future]]) -> bool:
+        merge = {GITHUB_INDEX_PATH: merge_index, GITHUB_BOARD_PATH: merge_ours}.get(path, merge3)
+        try:
+            ok = await gh_save(path, self._message(edits), merge)
+        except FitnessSaveError as clash:
+            # The cache now holds GitHub's version, so edits queued during
+            # the attempt are gone too.
+            for _, saved in edits + self.pending.pop(path, []):
+                if not saved.done():
+                    saved.set_exception(clash)
+            return True
+        if not ok:
+            self.pending[path] = edits + self.pending.get(path, [])
+            print(f'⚠️  Commit of {path} failed; {len(edits)} edit(s) kept for retry')
+            return False
+        for _, saved in edits:
+            if not saved.done():
+                saved.set_result(True)
+        return True
+
+    @staticmethod
+    def _message(edits: list[tuple[str, asyncio.Future]]) -> str:
+        lines = list(dict.fromkeys(msg for msg, _ in edits))
+        if len(lines) == 1:
+            return lines[0]
+        return f'Update fitness data ({len(edits)} changes)\n\n' + '\n'.join(f'- {m}' for m in lines)
+
+
+write_behind = WriteBehindQueue(FLUSH_WINDOW_S, FLUSH_MAX_PENDING)
+
+
+def index_entry(user_data: dict) -> dict:
+    meta = user_data['meta']
+    return {
+        'username':  meta.get('username'),
+        'is_public': meta.get('is_public', True),
+        'joined':    meta.get('joined'),
+        'digest':    meta.get('weekly_digest', False),
+        'deadlines': [{k: g.get(k) for k in ('id', 'field', 'target_date', 'reminders_sent')}
+                      for g in user_data.get('goals', []) if g.get('target_date') and not g.get('completed_at')],
     }
-    encoded = base64.b64encode(json.dumps(data, indent=2).encode()).decode()
-    payload  = {'message': message, 'content': encoded, 'branch': 'main'}
-    if sha:
-        payload['sha'] = sha
-    async with aiohttp.ClientSession() as session:
-        async with session.put(url, headers=headers, json=payload) as resp:
-            return resp.status in (200, 201)
+
+
+async def migrate_to_shards():
+    """
+    One-shot split of the legacy single-file document into one shard per
+    member plus the index. The index is written last, so its presence marks
+    the migration as done and a half-finished run simply redoes the shards.
+    The legacy file is left in place untouched.
+    """
+    if await gh_load(GITHUB_INDEX_PATH, PRIORITY_BACKGROUND) is not None:
+        return
+    status, text, _, _ = await gh_fetch(GITHUB_FILE_PATH, priority=PRIORITY_BACKGROUND)
+    if status == 404:
+        return
+    if text is None:
+        raise Exception(f'GitHub read failed: HTTP {status}')
+    users = json.loads(text).get('users', {})
+    for uid, user_data in users.items():
+        path = user_path(uid)
+        await gh_load(path, PRIORITY_BACKGROUND)
+        file_cache[path].data = user_data
+        if not await gh_save(path, f'Migrate fitness data for {user_data["meta"].get("username", uid)}',
+                             priority=PRIORITY_BACKGROUND):
+            raise Exception(f'Migration stopped: could not write {path}')
+    file_cache[GITHUB_INDEX_PATH].data = {'users': {uid: index_entry(u) for uid, u in users.items()}}
+    if not await gh_save(GITHUB_INDEX_PATH, 'Migrate fitness index', merge_index, PRIORITY_BACKGROUND):
+        raise Exception('Migration stopped: could not write the index')
+    print(f'🗂️  Migrated {len(users)} fitness profile(s) to per-user shards')
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  Data Helpers
@@ -96,23 +773,20 @@ def week_start_for(dt: datetime | None = None) -> str:
     return sunday.strftime('%Y-%m-%d')
 
 
-def ensure_user(data: dict, member: discord.Member | discord.User) -> dict:
-    uid = str(member.id)
-    if uid not in data['users']:
-        data['users'][uid] = {
-            'meta': {
-                'username':        member.display_name,
-                'is_public':       True,
-                'unit_preference': 'lbs',
-                'joined':          utcnow(),
-            },
-            'baseline':      None,
-            'goals':         [],
-            'stats':         [],
-            'workout_log':   [],
-            'history_notes': [],
-        }
-    return data['users'][uid]
+def new_user_record(member: discord.Member | discord.User) -> dict:
+    return {
+        'meta': {
+            'username':        member.display_name,
+            'is_public':       True,
+            'unit_preference': 'lbs',
+            'joined':          utcnow(),
+        },
+        'baseline':      None,
+        'goals':         [],
+        'stats':         [],
+        'workout_log':   [],
+        'history_notes': [],
+    }
 
 
 def unit_label(user_data: dict, field: str) -> str:
@@ -167,66 +841,1569 @@ def fitness_role_mention(guild: discord.Guild) -> str | None:
     return None
 
 
-def check_goals_after_update(user_data: dict) -> list[dict]:
+class StatSeries:
+    """
+    A record's stats as columns, in list order: recorded_at as epoch seconds
+    plus one float array per GOAL_FIELDS key, each with a presence mask
+    (missing values are stored as 0.0 and masked out). Every value is parsed
+    once, on the way in.
+    """
+    __slots__ = ('times', 'columns', 'present')
+
+    def __init__(self, stats: list[dict] = ()):
+        self.times   = array('d')
+        self.columns = {f: array('d') for f in GOAL_FIELDS}
+        self.present = {f: bytearray() for f in GOAL_FIELDS}
+        for entry in stats:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, entry: dict):
+        self.times.append(datetime.fromisoformat(entry['recorded_at']).timestamp())
+        for f in GOAL_FIELDS:
+            v = entry.get(f)
+            self.columns[f].append(0.0 if v is None else to_numeric(f, v))
+            self.present[f].append(v is not None)
+
+    def latest(self, field: str) -> float | None:
+        """field in the newest entry, or None if that entry didn't record it."""
+        if not self.times or not self.present[field][-1]:
+            return None
+        return self.columns[field][-1]
+
+    def last_recorded(self, field: str) -> float | None:
+        """field in the newest entry that recorded it, or None if none did."""
+        i = self.present[field].rfind(1)
+        return None if i < 0 else self.columns[field][i]
+
+    def points(self, field: str) -> tuple[array, array]:
+        """(times, values) of the entries that recorded field."""
+        mask = self.present[field]
+        ts, vs = array('d'), array('d')
+        for t, v, m in zip(self.times, self.columns[field], mask):
+            if m:
+                ts.append(t)
+                vs.append(v)
+        return ts, vs
+
+
+class Baseline:
+    """A record's baseline with numerics pre-parsed; unrecorded fields are None."""
+    __slots__ = ('set_at', *GOAL_FIELDS)
+
+    def __init__(self, raw: dict | None):
+        raw         = raw or {}
+        self.set_at = raw.get('set_at')
+        for f in GOAL_FIELDS:
+            v = raw.get(f)
+            setattr(self, f, None if v is None else to_numeric(f, v))
+
+
+class GoalSpec:
+    """One goal with its target and milestone step pre-parsed. goal is the record's own dict."""
+    __slots__ = ('goal', 'field', 'direction', 'target', 'step')
+
+    def __init__(self, goal: dict):
+        self.goal      = goal
+        self.field     = goal['field']
+        self.direction = goal['direction']
+        target         = goal.get('target_value')
+        self.target    = None if target is None else to_numeric(self.field, target)
+        step           = goal.get('milestone_pct')
+        self.step      = float(step) if step and MILESTONE_PCT_MIN <= float(step) <= MILESTONE_PCT_MAX else None
+
+
+def parse_milestone_pct(raw) -> float | None:
+    """A goal's milestone step from member input; None when blank."""
+    s = str(raw or '').strip()
+    if not s:
+        return None
+    step = parse_num(s)
+    if step is None or not MILESTONE_PCT_MIN <= step <= MILESTONE_PCT_MAX:
+        raise ValueError(f'Milestone % must be a number from {MILESTONE_PCT_MIN:g} to {MILESTONE_PCT_MAX:g}.')
+    return step
+
+
+def milestone_reached(goal: dict) -> float:
+    """
+    How far, in percent, the goal's announced milestones go (0 if none).
+    Progress is kept as the highest milestone index reached, milestone_k,
+    with the step it was counted in, milestone_step; older records list
+    every milestone in milestones_announced.
+    """
+    if goal.get('milestone_step'):
+        return round(goal['milestone_k'] * goal['milestone_step'], 6)
+    return max(goal.get('milestones_announced') or [0.0])
+
+
+def milestone_done_k(goal: dict, step: float) -> int:
+    """The highest milestone index, counted in step, already announced for goal."""
+    if goal.get('milestone_step') == step:
+        return goal['milestone_k']
+    # The step was edited since: everything up to the old reach counts as done.
+    return math.floor(milestone_reached(goal) / step + 1e-9)
+
+
+def milestone_lines(label: str, step: float, from_k: int, to_k: int) -> list[str]:
+    """Announcement lines for milestones from_k+1 … to_k, collapsed into one past MILESTONE_BURST_MAX."""
+    if to_k - from_k > MILESTONE_BURST_MAX:
+        return [f'🎉 **{to_k - from_k}** milestones hit for **{label}**, '
+                f'from **{(from_k + 1) * step:g}%** to **{to_k * step:g}%**!']
+    return [f'🎉 **{k * step:g}%** milestone hit for **{label}**!' for k in range(from_k + 1, to_k + 1)]
+
+
+def check_goals_after_update(user_data: dict, index: 'RecordIndex | None' = None) -> list[dict]:
     """
     Compare the latest stat snapshot against all incomplete goals.
-    Mutates goal records in-place (sets completed_at, milestones_announced).
-    Returns a list of event dicts: {goal, type: 'completed'|'milestone', milestone_pct?}
+    Mutates goal records in-place (sets completed_at, milestone_k / milestone_step).
+    Returns at most one event dict per goal: {goal, type: 'completed'} or
+    {goal, type: 'milestone', step, from_k, to_k} for milestones from_k+1 … to_k.
+    With the record's index the pre-parsed series, baseline and goals are
+    used; without, only the latest snapshot is parsed.
     """
-    events: list[dict] = []
     if not user_data.get('stats') or not user_data.get('goals'):
-        return events
+        return []
+    if index is not None:
+        series, baseline, goals = index.series, index.baseline, index.goals
+    else:
+        series   = StatSeries(user_data['stats'][-1:])
+        baseline = Baseline(user_data.get('baseline'))
+        goals    = [GoalSpec(g) for g in user_data['goals']]
+    events: list[dict] = []
+    for spec in goals:
+        events += settle_goal(spec, series, baseline)
+    return events
 
-    latest   = user_data['stats'][-1]
-    baseline = user_data.get('baseline') or {}
 
-    for goal in user_data['goals']:
-        if goal.get('completed_at'):
-            continue
+def settle_goal(spec: GoalSpec, series: StatSeries, baseline: Baseline) -> list[dict]:
+    """check_goals_after_update for a single goal."""
+    goal = spec.goal
+    if goal.get('completed_at'):
+        return []
 
-        field        = goal['field']
-        target_raw   = goal.get('target_value')
-        current_raw  = latest.get(field)
-        baseline_raw = baseline.get(field)
+    target   = spec.target
+    current  = series.latest(spec.field)
+    base_val = getattr(baseline, spec.field)
 
-        if any(v is None for v in (target_raw, current_raw, baseline_raw)):
-            continue
+    if any(v is None for v in (target, current, base_val)):
+        return []
 
-        target    = to_numeric(field, target_raw)
-        current   = to_numeric(field, current_raw)
-        base_val  = to_numeric(field, baseline_raw)
-        direction = goal['direction']
-
-        # ── Goal completion ───────────────────────────────────────────────────
-        completed = (direction == 'decrease' and current <= target) or \
-                    (direction == 'increase' and current >= target)
-        if completed:
-            goal['completed_at'] = utcnow()
-            events.append({'goal': goal, 'type': 'completed'})
-            continue
+    direction = spec.direction
 
-        # ── Milestone check ───────────────────────────────────────────────────
-        milestone_pct = goal.get('milestone_pct')
-        if not milestone_pct:
-            continue
-        total_delta = abs(target - base_val)
-        if total_delta == 0:
-            continue
-        progress = (base_val - current) if direction == 'decrease' else (current - base_val)
-        if progress <= 0:
+    # ── Goal completion ───────────────────────────────────────────────────────
+    completed = (direction == 'decrease' and current <= target) or \
+                (direction == 'increase' and current >= target)
+    if completed:
+        goal['completed_at'] = utcnow()
+        return [{'goal': goal, 'type': 'completed'}]
+
+    # ── Milestone check ───────────────────────────────────────────────────────
+    # Milestone k sits at k·step percent (k·step < 100). Work in k: the ones to
+    # announce lie between the highest k already announced and the highest k
+    # the current progress reaches, and go out as one event.
+    step = spec.step
+    if step is None:
+        return []
+    total_delta = abs(target - base_val)
+    if total_delta == 0:
+        return []
+    progress = (base_val - current) if direction == 'decrease' else (current - base_val)
+    if progress <= 0:
+        return []
+
+    reached_k = min(math.floor(progress / total_delta * 100 / step + 1e-9),
+                    math.ceil(100 / step - 1e-9) - 1)
+    done_k = milestone_done_k(goal, step)
+    if reached_k <= done_k:
+        return []
+    set_milestone(goal, step, reached_k)
+    return [{'goal': goal, 'type': 'milestone', 'step': step, 'from_k': done_k, 'to_k': reached_k}]
+
+
+def set_milestone(goal: dict, step: float, k: int):
+    goal['milestone_k']    = k
+    goal['milestone_step'] = step
+    goal.pop('milestones_announced', None)
+
+
+def _milestone_event_reach(event: dict) -> tuple[float, int]:
+    """(step, k) a goal_milestone event brings its goal to; old events name a single pct."""
+    if 'pct' in event:
+        return event['pct'], 1
+    return event['step'], event['to_k']
+
+
+def week_of(ts: str) -> str:
+    """week_start_for the date part of an ISO timestamp."""
+    return week_start_for(datetime.strptime(ts[:10], '%Y-%m-%d'))
+
+
+def _workout_key(w: dict) -> tuple[str, str]:
+    return w['logged_at'], w['id']
+
+
+def _remove_workout(log: list[dict], entry: dict):
+    """Delete entry from log, which is kept in _workout_key order, at its bisected position."""
+    i = bisect.bisect_left(log, _workout_key(entry), key=_workout_key)
+    if i < len(log) and log[i] is entry:
+        del log[i]
+    else:
+        log.remove(entry)   # a log saved out of order by an older version
+
+
+class RecordIndex:
+    """
+    Lookup structures over one record: stats, workouts and notes bucketed by
+    week_start, the workout log in time order with an id → entry map, and
+    the stats as a pre-parsed StatSeries with the baseline and goals parsed
+    alongside.
+    Built once per record object (see record_index) and patched by
+    apply_event as events land, so rendering a week or a log page costs
+    O(entries shown). Everything holds the record's own dicts, so in-place
+    edits show through.
+    """
+    def __init__(self, user_data: dict):
+        self.record = user_data
+        self.stats:    dict[str, list[dict]] = {}
+        self.workouts: dict[str, list[dict]] = {}
+        self.notes:    dict[str, dict]       = {}
+        self.workout_order: list[dict]      = []   # oldest first, by (logged_at, id)
+        self.workout_ids:   dict[str, dict] = {}
+        self.series = StatSeries()
+        self._baseline: Baseline | None       = None
+        self._goals:    list[GoalSpec] | None = None
+        self.revision = 0   # bumped whenever stats, baseline or goals change
+        self.trends:  tuple[int, dict] | None = None   # (revision, compute_trends result)
+        for s in user_data.get('stats', []):
+            self.add_stat(s)
+        for w in user_data.get('workout_log', []):
+            self.add_workout(w)
+        for n in user_data.get('history_notes', []):
+            self.notes[n['week_start']] = n
+
+    def has_stat(self, recorded_at: str) -> bool:
+        bucket = self.stats.get(week_of(recorded_at), [])
+        i      = bisect.bisect_left(bucket, recorded_at, key=lambda s: s['recorded_at'])
+        return i < len(bucket) and bucket[i]['recorded_at'] == recorded_at
+
+    def add_stat(self, entry: dict):
+        """Index entry, which has just been appended to the record's stats."""
+        bisect.insort(self.stats.setdefault(week_of(entry['recorded_at']), []), entry,
+                      key=lambda s: s['recorded_at'])
+        self.series.append(entry)
+        self.revision += 1
+
+    @property
+    def baseline(self) -> Baseline:
+        if self._baseline is None:
+            self._baseline = Baseline(self.record.get('baseline'))
+        return self._baseline
+
+    @property
+    def goals(self) -> list[GoalSpec]:
+        if self._goals is None:
+            self._goals = [GoalSpec(g) for g in self.record.get('goals', [])]
+        return self._goals
+
+    def rebuild(self):
+        """Re-index the whole record, for changes too large to patch in (e.g. imports)."""
+        revision = self.revision
+        self.__init__(self.record)
+        self.revision += revision + 1
+
+    def goals_changed(self):
+        """The baseline or a goal's definition changed; re-parse them on next use."""
+        self._baseline = None
+        self._goals    = None
+        self.revision += 1
+
+    def add_workout(self, entry: dict):
+        bisect.insort(self.workouts.setdefault(week_of(entry['logged_at']), []), entry, key=_workout_key)
+        bisect.insort(self.workout_order, entry, key=_workout_key)
+        self.workout_ids[entry['id']] = entry
+
+    def remove_workout(self, entry: dict):
+        _remove_workout(self.workouts.get(week_of(entry['logged_at']), []), entry)
+        _remove_workout(self.workout_order, entry)
+        self.workout_ids.pop(entry['id'], None)
+
+    def week(self, ws: str) -> tuple[list[dict], list[dict], dict | None]:
+        """→ (stats, workouts, note) for the week starting ws."""
+        return self.stats.get(ws, []), self.workouts.get(ws, []), self.notes.get(ws)
+
+    def workout_page(self, page: int, size: int) -> tuple[list[dict], int]:
+        """Newest-first page of the workout log → (entries, total entries)."""
+        total = len(self.workout_order)
+        hi    = total - page * size
+        return self.workout_order[max(0, hi - size):max(0, hi)][::-1], total
+
+
+record_indexes: dict[str, RecordIndex] = {}   # uid → index of that member's current record
+
+
+def record_index(uid: str, user_data: dict) -> RecordIndex:
+    """uid's index, rebuilt if user_data isn't the record it was built from."""
+    index = record_indexes.get(uid)
+    if index is None or index.record is not user_data:
+        index = record_indexes[uid] = RecordIndex(user_data)
+    return index
+
+
+def built_record_index(uid: str, user_data: dict | None) -> RecordIndex | None:
+    """uid's index if one is already built for user_data, for apply_event to keep current."""
+    index = record_indexes.get(uid)
+    return index if index is not None and index.record is user_data else None
+
+
+def archive_cutoff() -> str:
+    """Entries recorded before this date (YYYY-MM-DD) belong in the archive."""
+    return (datetime.now(timezone.utc) - timedelta(days=ARCHIVE_HORIZON_DAYS)).strftime('%Y-%m-%d')
+
+
+def split_archivable(user_data: dict, before: str) -> dict[int, dict]:
+    """user_data's stats and workouts dated before `before`, by year → {'stats': [...], 'workout_log': [...]}."""
+    cold: dict[int, dict] = {}
+    for key, ts in (('stats', 'recorded_at'), ('workout_log', 'logged_at')):
+        for entry in user_data.get(key, []):
+            if entry[ts][:10] < before:
+                cold.setdefault(int(entry[ts][:4]), {'stats': [], 'workout_log': []})[key].append(entry)
+    return cold
+
+
+def merge_archive(archive: dict, part: dict) -> dict:
+    """archive with part's entries added; entries already there (same recorded_at / id) are kept once."""
+    stats    = {s['recorded_at']: s for s in archive.get('stats', []) + part['stats']}
+    workouts = {w['id']: w for w in archive.get('workout_log', []) + part['workout_log']}
+    return {
+        'stats':       sorted(stats.values(), key=lambda s: s['recorded_at']),
+        'workout_log': sorted(workouts.values(), key=_workout_key),
+    }
+
+
+archive_indexes: dict[tuple[str, int], RecordIndex] = {}   # (uid, year) → index of that archive segment
+
+
+async def history_week(uid: str, user_data: dict, ws: str) -> tuple[list[dict], list[dict], dict | None]:
+    """
+    RecordIndex.week for the week starting ws, including whatever of it has
+    moved to the member's archive. Archive segments are only fetched (and
+    indexed) the first time history reaches back into their year.
+    """
+    stats, workouts, note = record_index(uid, user_data).week(ws)
+    archive = user_data.get('archive')
+    if not archive or ws >= archive['before']:
+        return stats, workouts, note
+    week_end = (datetime.strptime(ws, '%Y-%m-%d') + timedelta(days=6)).year
+    for year in sorted({int(ws[:4]), week_end} & set(archive['years'])):
+        data = await storage.load_archive(uid, year)
+        if data is None:
             continue
+        index = archive_indexes.get((uid, year))
+        if index is None or index.record is not data:
+            index = archive_indexes[(uid, year)] = RecordIndex(data)
+        cold_stats, cold_workouts, _ = index.week(ws)
+        stats    = sorted({s['recorded_at']: s for s in cold_stats + stats}.values(), key=lambda s: s['recorded_at'])
+        workouts = sorted({w['id']: w for w in cold_workouts + workouts}.values(), key=lambda w: w['logged_at'])
+    return stats, workouts, note
 
-        progress_pct = (progress / total_delta) * 100
-        announced    = goal.setdefault('milestones_announced', [])
-        step         = float(milestone_pct)
-        thresh       = step
-        while thresh < 100.0:
-            if progress_pct >= thresh and thresh not in announced:
-                announced.append(thresh)
-                events.append({'goal': goal, 'type': 'milestone', 'milestone_pct': thresh})
-            thresh += step
 
-    return events
+def has_stat(user_data: dict, recorded_at: str, index: RecordIndex | None = None) -> bool:
+    if index is not None:
+        return index.has_stat(recorded_at)
+    return any(s['recorded_at'] == recorded_at for s in user_data['stats'])
+
+
+def find_workout(user_data: dict, entry_id: str, index: RecordIndex | None = None) -> dict | None:
+    if index is not None:
+        return index.workout_ids.get(entry_id)
+    return next((w for w in user_data['workout_log'] if w['id'] == entry_id), None)
+
+
+def goal_event_change(event: dict) -> dict:
+    """The journal change recording one check_goals_after_update event."""
+    if event['type'] == 'completed':
+        return {'type': 'goal_completed', 'goal_id': event['goal']['id'],
+                'completed_at': event['goal']['completed_at']}
+    return {'type': 'goal_milestone', 'goal_id': event['goal']['id'],
+            'step': event['step'], 'from_k': event['from_k'], 'to_k': event['to_k']}
+
+
+def event_changes(user_data: dict | None, event: dict, index: RecordIndex | None = None) -> bool:
+    """
+    Whether apply_event(user_data, event) would change the record. Looks only
+    at what the event touches, so the cost follows the change, not the record.
+    """
+    kind = event['type']
+    if user_data is None:
+        return kind == 'user_created'
+    if kind == 'user_created':
+        return False
+    if kind == 'baseline_set':
+        return (user_data['meta'].get('unit_preference') != event['unit']
+                or user_data.get('baseline') != event['baseline'])
+    if kind == 'stat_appended':
+        return not has_stat(user_data, event['entry']['recorded_at'], index)
+    if kind == 'stats_imported':
+        have = {s['recorded_at'] for s in user_data['stats']}
+        return any(e['recorded_at'] not in have for e in event['entries'])
+    if kind in ('goal_upserted', 'goal_deleted', 'goal_completed', 'goal_milestone', 'goal_reminded'):
+        goal_id = event['goal']['id'] if kind == 'goal_upserted' else event['goal_id']
+        goal    = next((g for g in user_data['goals'] if g['id'] == goal_id), None)
+        if kind == 'goal_upserted':
+            return goal is None or any(goal.get(k) != v for k, v in event['goal'].items())
+        if goal is None:
+            return False
+        if kind == 'goal_deleted':
+            return True
+        if kind == 'goal_completed':
+            return not goal.get('completed_at')
+        if kind == 'goal_milestone':
+            step, k = _milestone_event_reach(event)
+            return round(k * step, 6) > milestone_reached(goal)
+        return event['days'] not in goal.get('reminders_sent', [])
+    if kind == 'workout_appended':
+        return find_workout(user_data, event['entry']['id'], index) is None
+    if kind in ('workout_edited', 'workout_deleted'):
+        w = find_workout(user_data, event['entry_id'], index)
+        if w is None:
+            return False
+        return kind == 'workout_deleted' or any(w.get(k) != v for k, v in event['changes'].items())
+    if kind == 'note_upserted':
+        note = next((n for n in user_data.get('history_notes', []) if n['week_start'] == event['week_start']), None)
+        return note is None or note['note'] != event['note']
+    if kind == 'privacy_set':
+        return user_data['meta'].get('is_public', True) != event['is_public']
+    if kind == 'digest_set':
+        return user_data['meta'].get('weekly_digest', False) != event['enabled']
+    return True
+
+
+def apply_event(user_data: dict | None, event: dict, index: RecordIndex | None = None) -> dict | None:
+    """
+    Apply one journal event to a member record, in place where possible, and
+    return the record. Every event is idempotent, so replaying a journal over
+    a snapshot that already contains some of it is harmless. index, if given,
+    is the record's RecordIndex; it is kept in step and used for id lookups.
+    """
+    kind = event['type']
+    if user_data is None:
+        return copy.deepcopy(event['record']) if kind == 'user_created' else None
+
+    if kind == 'baseline_set':
+        user_data['meta']['unit_preference'] = event['unit']
+        user_data['baseline'] = copy.deepcopy(event['baseline'])
+
+    elif kind == 'stat_appended':
+        if not has_stat(user_data, event['entry']['recorded_at'], index):
+            entry = copy.deepcopy(event['entry'])
+            user_data['stats'].append(entry)
+            if index is not None:
+                index.add_stat(entry)
+
+    elif kind == 'stats_imported':
+        have  = {s['recorded_at'] for s in user_data['stats']}
+        fresh = [copy.deepcopy(e) for e in event['entries'] if e['recorded_at'] not in have]
+        if fresh:
+            # Imports are usually older than what's already there; keep the list in time order.
+            user_data['stats'] = sorted(user_data['stats'] + fresh, key=lambda s: s['recorded_at'])
+            if index is not None:
+                index.rebuild()
+
+    elif kind == 'goal_upserted':
+        goals = user_data['goals']
+        i     = next((i for i, g in enumerate(goals) if g['id'] == event['goal']['id']), None)
+        if i is None:
+            goals.append(copy.deepcopy(event['goal']))
+        else:
+            goals[i] = {**goals[i], **copy.deepcopy(event['goal'])}
+
+    elif kind == 'goal_deleted':
+        user_data['goals'] = [g for g in user_data['goals'] if g['id'] != event['goal_id']]
+
+    elif kind in ('goal_completed', 'goal_milestone'):
+        goal = next((g for g in user_data['goals'] if g['id'] == event['goal_id']), None)
+        if goal is None:
+            pass
+        elif kind == 'goal_completed':
+            if not goal.get('completed_at'):
+                goal['completed_at'] = event['completed_at']
+        else:
+            step, k = _milestone_event_reach(event)
+            if round(k * step, 6) > milestone_reached(goal):
+                set_milestone(goal, step, k)
+
+    elif kind == 'workout_appended':
+        if find_workout(user_data, event['entry']['id'], index) is None:
+            entry = copy.deepcopy(event['entry'])
+            bisect.insort(user_data['workout_log'], entry, key=_workout_key)
+            if index is not None:
+                index.add_workout(entry)
+
+    elif kind == 'workout_edited':
+        w = find_workout(user_data, event['entry_id'], index)
+        if w is not None:
+            moved = 'logged_at' in event['changes']
+            if moved:
+                _remove_workout(user_data['workout_log'], w)
+                if index is not None:
+                    index.remove_workout(w)
+            w.update(copy.deepcopy(event['changes']))
+            if moved:
+                bisect.insort(user_data['workout_log'], w, key=_workout_key)
+                if index is not None:
+                    index.add_workout(w)
+
+    elif kind == 'workout_deleted':
+        w = find_workout(user_data, event['entry_id'], index)
+        if w is not None:
+            if index is not None:
+                index.remove_workout(w)
+            _remove_workout(user_data['workout_log'], w)
+
+    elif kind == 'note_upserted':
+        notes    = user_data.setdefault('history_notes', [])
+        existing = next((n for n in notes if n['week_start'] == event['week_start']), None)
+        if existing:
+            existing['note'] = event['note']
+        else:
+            notes.append({'week_start': event['week_start'], 'note': event['note']})
+            if index is not None:
+                index.notes[event['week_start']] = notes[-1]
+
+    elif kind == 'privacy_set':
+        user_data['meta']['is_public'] = event['is_public']
+
+    elif kind == 'digest_set':
+        user_data['meta']['weekly_digest'] = event['enabled']
+
+    elif kind == 'goal_reminded':
+        goal = next((g for g in user_data['goals'] if g['id'] == event['goal_id']), None)
+        if goal is not None and event['days'] not in goal.setdefault('reminders_sent', []):
+            goal['reminders_sent'].append(event['days'])
+
+    if index is not None and kind in ('baseline_set', 'goal_upserted', 'goal_deleted'):
+        index.goals_changed()
+    return user_data
+
+
+def goal_progress(spec: GoalSpec, current: float | None, base_val: float | None) -> float | None:
+    """Percent of the way from baseline to target, 0–100; None if it can't be told."""
+    if spec.goal.get('completed_at'):
+        return 100.0
+    if spec.target is None or current is None or base_val is None or spec.target == base_val:
+        return None
+    progress = (base_val - current) if spec.direction == 'decrease' else (current - base_val)
+    return min(100.0, max(0.0, progress / abs(spec.target - base_val) * 100))
+
+
+def board_row(index: RecordIndex) -> dict:
+    """
+    A member's leaderboard aggregates, read off their record index: mean goal
+    progress, improvement % since the baseline per stat field (positive is
+    better), and workout counts for the LEADERBOARD_WEEKS weeks up to their
+    latest logged week plus the streak ending there. Leaderboard resolves
+    the week-relative parts against the current week.
+    """
+    meta     = index.record['meta']
+    series   = index.series
+    baseline = index.baseline
+    latest   = {f: series.last_recorded(f) for f in GOAL_FIELDS}
+
+    improvement = {}
+    for f, info in GOAL_FIELDS.items():
+        base_val, current = getattr(baseline, f), latest[f]
+        if base_val and current is not None:
+            change = (current - base_val) / abs(base_val) * 100
+            improvement[f] = round(-change if info['direction'] == 'decrease' else change, 2)
+
+    progress = [goal_progress(spec, latest[spec.field], getattr(baseline, spec.field)) for spec in index.goals]
+    progress = [p for p in progress if p is not None]
+
+    last_week, recent, streak = None, [], 0
+    if index.workout_order:
+        last_week = week_of(index.workout_order[-1]['logged_at'])
+        day       = datetime.strptime(last_week, '%Y-%m-%d')
+        while index.workouts.get(week_start_for(day - timedelta(weeks=streak))):
+            streak += 1
+        recent = [len(index.workouts.get(week_start_for(day - timedelta(weeks=i)), []))
+                  for i in range(LEADERBOARD_WEEKS)]
+
+    return {
+        'username':    meta.get('username'),
+        'is_public':   meta.get('is_public', True),
+        'progress':    round(sum(progress) / len(progress), 2) if progress else None,
+        'improvement': improvement,
+        'last_week':   last_week,
+        'recent':      recent,     # workouts per week, newest first, ending at last_week
+        'streak':      streak,     # consecutive weeks with a workout, ending at last_week
+    }
+
+
+class Leaderboard:
+    """
+    Every member's board_row, replaced by the storage backend whenever one of
+    their edits lands, so ranking never reads anyone's history: each row
+    resolves to a metric in O(1) and a heap picks the top k.
+    Metrics: 'progress', 'workouts', 'streak', or a GOAL_FIELDS key for
+    improvement in that field.
+    """
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+
+    def update(self, uid: str, user_data: dict) -> dict:
+        row = self.rows[uid] = board_row(record_index(uid, user_data))
+        return row
+
+    def seed(self, rows: dict[str, dict]):
+        """Rows from storage at startup; rows already updated this run win."""
+        for uid, row in rows.items():
+            self.rows.setdefault(uid, row)
+
+    @staticmethod
+    def value(row: dict, metric: str, this_week: str) -> float | None:
+        if metric == 'progress':
+            return row['progress']
+        if metric in ('workouts', 'streak'):
+            if row['last_week'] is None:
+                return None
+            gap = (datetime.strptime(this_week, '%Y-%m-%d') - datetime.strptime(row['last_week'], '%Y-%m-%d')).days // 7
+            if metric == 'streak':
+                return row['streak'] if gap <= 1 else 0   # this week doesn't break a streak until it's over
+            return sum(row['recent'][:max(0, LEADERBOARD_WEEKS - gap)]) / LEADERBOARD_WEEKS
+        return row['improvement'].get(metric)
+
+    def top(self, metric: str, eligible, k: int = LEADERBOARD_SIZE) -> list[tuple[float, str, dict]]:
+        """The k public members passing eligible(uid) with the highest metric → [(value, uid, row)]."""
+        this_week = week_start_for()
+        scored    = ((self.value(row, metric, this_week), uid, row)
+                     for uid, row in self.rows.items() if row['is_public'] and eligible(uid))
+        return heapq.nlargest(k, (s for s in scored if s[0] is not None), key=lambda s: s[0])
+
+
+leaderboard = Leaderboard()
+
+
+def record_saved(uid: str, user_data: dict):
+    """Bring the in-memory views derived from uid's record up to date after an edit."""
+    leaderboard.update(uid, user_data)
+    goal_reminders.sync(uid, user_data.get('goals', []))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Storage Backends
+# ═══════════════════════════════════════════════════════════════════════════════
+class FitnessStore:
+    """
+    Everything the fitness views persist goes through one of these. Every
+    write returns the member's updated record in the usual JSON shape.
+    """
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def load_user(self, uid: str) -> dict | None:
+        raise NotImplementedError
+
+    async def set_baseline(self, member: discord.Member | discord.User, unit: str, baseline: dict) -> dict:
+        raise NotImplementedError
+
+    async def append_stat(self, member: discord.Member | discord.User, entry: dict) -> tuple[dict, list[dict]]:
+        """Append a stat snapshot and settle goals against it → (record, goal events)."""
+        raise NotImplementedError
+
+    async def upsert_goal(self, member: discord.Member | discord.User, goal: dict) -> dict:
+        """Add goal, or merge its keys into the existing goal with the same id."""
+        raise NotImplementedError
+
+    async def delete_goal(self, member: discord.Member | discord.User, goal_id: str) -> dict:
+        raise NotImplementedError
+
+    async def append_workout(self, member: discord.Member | discord.User, entry: dict) -> dict:
+        raise NotImplementedError
+
+    async def update_workout(self, member: discord.Member | discord.User, entry_id: str, changes: dict) -> dict:
+        raise NotImplementedError
+
+    async def delete_workout(self, member: discord.Member | discord.User, entry_id: str) -> dict:
+        raise NotImplementedError
+
+    async def upsert_note(self, member: discord.Member | discord.User, ws: str, note: str) -> dict:
+        raise NotImplementedError
+
+    async def set_privacy(self, member: discord.Member | discord.User, is_public: bool) -> dict:
+        raise NotImplementedError
+
+    async def set_digest(self, member: discord.Member | discord.User, enabled: bool) -> dict:
+        raise NotImplementedError
+
+    async def digest_records(self) -> dict[str, dict]:
+        """{uid: record} of every public member who opted in to the weekly digest, loaded together."""
+        raise NotImplementedError
+
+    async def mark_goal_reminded(self, member: discord.Member | discord.User, goal_id: str, days: int) -> dict:
+        """Record that the days-out reminder for goal_id went out."""
+        raise NotImplementedError
+
+    async def goal_deadlines(self) -> dict[str, list[dict]]:
+        """{uid: goals} for every incomplete goal with a target_date, for seeding the reminder heap at startup."""
+        raise NotImplementedError
+
+    async def import_records(self, member: discord.Member | discord.User, changes: list[dict]) -> dict:
+        """
+        Apply a bulk import (stats_imported / workout_appended / goal_upserted /
+        note_upserted changes, see import_changes) as one write.
+        """
+        raise NotImplementedError
+
+    async def load_archive(self, uid: str, year: int) -> dict | None:
+        """
+        The member's archived entries from year ({'stats', 'workout_log'}),
+        or None if there are none. Records list archived years under
+        'archive': {'before': YYYY-MM-DD, 'years': [...]}.
+        """
+        return None
+
+    def cached_user(self, uid: str) -> dict | None:
+        """The member's record if it's already in memory, without any I/O; None if not."""
+        return None
+
+    def record_version(self, uid: str):
+        """A cheap token that changes whenever the record cached_user returns does."""
+        return None
+
+    def status(self) -> dict:
+        """Backend health for /b4c0nstatus: label → value."""
+        return {}
+
+
+class GitHubStore(FitnessStore):
+    """
+    Per-member shards in the GitHub repo, via the write-behind queue. A shard
+    is a snapshot: edits append small events to the member's journal
+    (<uid>.journal.jsonl) instead of rewriting it, load_user replays the
+    journal over the snapshot, and compact() folds the journal back into the
+    shard once it passes JOURNAL_COMPACT_EVENTS / JOURNAL_COMPACT_BYTES, and
+    every JOURNAL_COMPACT_INTERVAL_S. The journal's git history is the
+    member's audit trail. Compaction also moves stats and workouts older
+    than ARCHIVE_HORIZON_DAYS out of the shard into <uid>.archive.<year>.json,
+    so everyday loads stay small; load_archive fetches those on demand.
+
+    Edits are acknowledged as soon as their events are fsync'd to the local
+    WAL (FITNESS_WAL_PATH); the push to GitHub happens in the background.
+    Events still in the WAL at startup are re-queued, and close() drains
+    whatever is pending.
+    """
+    _NO_EVENTS: tuple = ()
+
+    def __init__(self, wal_path: str = FITNESS_WAL_PATH):
+        # uid → [snapshot, events, n_replayed, record]; rebuilt whenever the
+        # snapshot dict or the events list is swapped for a new one
+        self._replayed:    dict[str, list]         = {}
+        self._compactions: dict[str, asyncio.Task] = {}
+        self._compactor:   asyncio.Task | None     = None
+        self.wal_path    = wal_path
+        self._wal        = None
+        self._wal_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fitness-wal')
+        self._unpushed:  set[str]          = set()   # ids of WAL'd events GitHub doesn't have yet
+        self._wal_backlog: dict[str, list[dict]] | None = None   # uid → WAL records from before this start, not yet re-queued
+        self._pushes:    set[asyncio.Task] = set()
+        self._board_fill: asyncio.Task | None = None
+        self._board_flush: asyncio.Task | None = None
+        self._board_dirty = False   # leaderboard rows changed since GITHUB_BOARD_PATH was last queued
+        self._connecting: asyncio.Task | None = None
+        self._connected     = asyncio.Event()
+        self._connect_error: str | None = None
+
+    async def open(self):
+        """
+        Read the WAL, then connect to GitHub in the background so the bot
+        starts even without a token or during an outage. The WAL's events
+        count as unpushed from here on, so nothing trims them before they're
+        replayed; fitness commands raise FitnessUnavailable until connected.
+        """
+        if self._wal is None:
+            loop      = asyncio.get_running_loop()
+            self._wal = await loop.run_in_executor(self._wal_thread, open, self.wal_path, 'a+', 1, 'utf-8')
+            await self._read_wal()
+        if self._connecting is None:
+            self._connecting = asyncio.create_task(self._connect_retrying())
+
+    async def _connect_retrying(self):
+        delay = STORAGE_OPEN_BACKOFF_S
+        while True:
+            try:
+                await self._connect()
+            except Exception as ex:
+                self._connect_error = str(ex)
+                print(f'⚠️  Fitness storage could not reach GitHub ({ex}); retrying in {delay:.0f}s')
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, STORAGE_OPEN_MAX_S)
+                continue
+            self._connected.set()
+            self._connect_error = None
+            print('🐙 Fitness storage connected')
+            return
+
+    def _check_connected(self):
+        if not self._connected.is_set():
+            raise FitnessUnavailable('Fitness storage is unavailable right now (still connecting to GitHub). '
+                                     'Please try again in a few minutes.')
+
+    async def _connect(self):
+        """The network half of open(): migrate, replay the WAL, seed the in-memory views. Safe to retry."""
+        await migrate_to_shards()
+        await self._replay_wal()
+        board = await gh_load(GITHUB_BOARD_PATH, PRIORITY_BACKGROUND) or {'rows': {}}
+        index = file_cache[GITHUB_INDEX_PATH].data or {'users': {}}
+        # Rows used to live in the index; move any found there to the board file.
+        legacy = {uid: e.pop('board') for uid, e in index['users'].items() if 'board' in e}
+        if legacy:
+            self._board_dirty = True
+            write_behind.mark_dirty(GITHUB_INDEX_PATH, 'Move leaderboard rows out of the fitness index')
+        leaderboard.seed({**legacy, **board['rows']})
+        self._stage_board()
+        for uid, goals in (await self.goal_deadlines()).items():
+            goal_reminders.sync(uid, goals)
+        for uid in list(self._replayed):   # records with WAL'd edits are newer than their index / board entry
+            if self._replay(uid) is not None:
+                record_saved(uid, self._replay(uid))
+                self._board_dirty = True
+        self._compactor   = asyncio.create_task(self._compact_periodically())
+        self._board_flush = asyncio.create_task(self._flush_board_periodically())
+        missing = [uid for uid, e in index['users'].items() if uid not in leaderboard.rows or 'deadlines' not in e]
+        if missing:
+            self._board_fill = asyncio.create_task(self._fill_index(missing))
+
+    async def close(self):
+        for task in (self._connecting, self._compactor, self._board_fill, self._board_flush):
+            if task is not None:
+                task.cancel()
+        self._stage_board()
+        await write_behind.flush()
+        if self._pushes:
+            # Pushes finish by queueing their index update; flush that too.
+            await asyncio.wait(self._pushes, timeout=SHUTDOWN_DRAIN_S)
+            await write_behind.flush()
+        if self._unpushed:
+            print(f'⚠️  {len(self._unpushed)} fitness event(s) left in {self.wal_path} for the next start')
+        if self._wal is not None:
+            await asyncio.get_running_loop().run_in_executor(self._wal_thread, self._wal.close)
+            self._wal = None
+
+    async def load_user(self, uid: str) -> dict | None:
+        self._check_connected()
+        return await self._load(uid, PRIORITY_READ)
+
+    def cached_user(self, uid: str) -> dict | None:
+        return self._replay(uid) if uid in self._replayed else None
+
+    def record_version(self, uid: str):
+        # Events are applied to the record in place, so count them as well as its identity.
+        state = self._replayed.get(uid)
+        return (id(state[3]), state[2]) if state is not None else None
+
+    async def load_archive(self, uid: str, year: int) -> dict | None:
+        self._check_connected()
+        # Only compaction writes archives, and from this process, so a cached segment is current.
+        cached = file_cache.get(archive_path(uid, year))
+        if cached is not None and cached.data is not None:
+            return cached.data
+        return await gh_load(archive_path(uid, year), PRIORITY_READ)
+
+    async def _load(self, uid: str, priority: int) -> dict | None:
+        await asyncio.gather(gh_load(user_path(uid), priority), gh_load(journal_path(uid), priority))
+        return self._replay(uid)
+
+    def status(self) -> dict:
+        return {
+            'GitHub': 'connected' if self._connected.is_set() else f'connecting ({self._connect_error or "…"})',
+            'Files awaiting commit': len(write_behind.pending),
+            'Events not yet on GitHub': len(self._unpushed),
+        }
+
+    def _replay(self, uid: str) -> dict | None:
+        """uid's record as of the cached snapshot + journal; only new events are applied."""
+        snapshot = file_cache[user_path(uid)].data
+        journal  = file_cache[journal_path(uid)].data
+        events   = journal['events'] if journal is not None else self._NO_EVENTS
+        state    = self._replayed.get(uid)
+        if state is None or state[0] is not snapshot or state[1] is not events:
+            state = self._replayed[uid] = [snapshot, events, 0, copy.deepcopy(snapshot)]
+        for event in events[state[2]:]:
+            state[3] = apply_event(state[3], event, built_record_index(uid, state[3]))
+        state[2] = len(events)
+        return state[3]
+
+    async def _edit(self, member, message: str, *changes: dict, settle=None) -> dict:
+        """
+        Apply changes to member's record, append them to their journal and
+        the WAL, and push them in the background. settle(record) may change the record further and
+        returns the changes that describe what it did. Edits that leave the
+        record unchanged are dropped.
+        """
+        uid     = str(member.id)
+        path    = journal_path(uid)
+        record  = await self.load_user(uid)
+        changed = False
+        if record is None:
+            changes = ({'type': 'user_created', 'record': new_user_record(member)}, *changes)
+        for change in changes:
+            # Built once per record object and patched from then on, so the
+            # checks below look entries up instead of scanning the record.
+            index   = record_index(uid, record) if record is not None else None
+            changed = event_changes(record, change, index) or changed
+            record  = apply_event(record, change, index)
+        if settle is not None:
+            settled  = tuple(settle(record))
+            changes += settled
+            changed  = changed or bool(settled)
+        if not changed:
+            return record
+        entry = file_cache[path]
+        if entry.data is None:
+            entry.data = {'events': []}
+        events = entry.data['events']
+        fresh = [{'id': uuid.uuid4().hex, 'at': utcnow(), **c} for c in changes]
+        events.extend(fresh)
+        self._replayed[uid] = [file_cache[user_path(uid)].data, events, len(events), record]
+        self._unpushed.update(e['id'] for e in fresh)
+        record_saved(uid, record)
+        self._board_dirty = True
+        # Queued (and the cached journal's version bumped) before the first
+        # await, so a load finishing meanwhile can't replace it with GitHub's copy.
+        self._push(uid, member.name, message, fresh)
+        try:
+            await self._wal_append([{'uid': uid, 'name': member.name, 'message': message, 'event': e} for e in fresh])
+        except OSError as ex:
+            print(f'⚠️  Fitness WAL write failed, pushing without it: {ex}')
+        return record
+
+    async def _wal_append(self, records: list[dict]):
+        if self._wal is None:   # storage never opened; nothing to make durable against
+            return
+
+        def write():
+            self._wal.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records))
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+        await asyncio.get_running_loop().run_in_executor(self._wal_thread, write)
+
+    async def _wal_trim(self):
+        """Empty the WAL once everything in it is on GitHub."""
+        def trim():
+            if self._wal is not None and not self._unpushed:
+                self._wal.truncate(0)
+                os.fsync(self._wal.fileno())
+        await asyncio.get_running_loop().run_in_executor(self._wal_thread, trim)
+
+    async def _read_wal(self):
+        """Load the WAL left by the last run into _wal_backlog, marking its events unpushed."""
+        def read():
+            self._wal.seek(0)
+            return [json.loads(line) for line in self._wal if line.strip()]
+        records = await asyncio.get_running_loop().run_in_executor(self._wal_thread, read)
+        self._wal_backlog = {}
+        for r in records:
+            self._wal_backlog.setdefault(r['uid'], []).append(r)
+        self._unpushed.update(r['event']['id'] for r in records)
+
+    async def _replay_wal(self):
+        """
+        Re-queue WAL'd events that never reached GitHub, e.g. after a crash.
+        Members are taken off the backlog as they're done, so a retried
+        open() picks up where a failed one stopped.
+        """
+        replayed = 0
+        for uid in list(self._wal_backlog or {}):
+            recs = self._wal_backlog[uid]
+            await self._load(uid, PRIORITY_BACKGROUND)
+            entry = file_cache[journal_path(uid)]
+            if entry.data is None:
+                entry.data = {'events': []}
+            have    = {e['id'] for e in entry.data['events']}
+            missing = [r['event'] for r in recs if r['event']['id'] not in have]
+            self._unpushed.difference_update(r['event']['id'] for r in recs if r['event']['id'] in have)
+            if missing:
+                entry.data['events'].extend(missing)
+                self._replay(uid)
+                self._push(uid, recs[-1]['name'], recs[-1]['message'], missing)
+                replayed += len(missing)
+            del self._wal_backlog[uid]
+        if replayed:
+            print(f'📒 Re-queued {replayed} fitness event(s) from {self.wal_path}')
+        elif not self._unpushed:
+            await self._wal_trim()
+
+    def _push(self, uid: str, name: str, message: str, events: list[dict]):
+        """Queue events, already in uid's cached journal, for commit; the queueing itself is synchronous."""
+        saved = write_behind.mark_dirty(journal_path(uid), message)
+        task  = asyncio.create_task(self._push_now(uid, name, message, events, saved))
+        self._pushes.add(task)
+        task.add_done_callback(self._pushes.discard)
+
+    async def _push_now(self, uid: str, name: str, message: str, events: list[dict], saved: asyncio.Future):
+        """Wait for uid's journal commit (saved), then update the index; finally release events from the WAL."""
+        path = journal_path(uid)
+        try:
+            await saved   # the queue retries until it lands
+            # The journal is the source of truth; the index only follows
+            # committed edits, and only changes when the listing itself does.
+            record  = self._replay(uid)
+            index   = await gh_load(GITHUB_INDEX_PATH, PRIORITY_WRITE)
+            if index is None:
+                index = file_cache[GITHUB_INDEX_PATH].data = {'users': {}}
+            listing = index_entry(record)
+            if index['users'].get(uid) != listing:
+                index['users'][uid] = listing
+                await write_behind.mark_dirty(GITHUB_INDEX_PATH, f'Index updated for {name}')
+        except FitnessSaveError as clash:
+            # The cached journal was reset to GitHub's; put these events back
+            # on top of it. They stay in the WAL until that lands.
+            print(f'⚠️  Fitness edit for {name} clashed, re-queued: {clash}')
+            entry = file_cache[path]
+            if entry.data is None:
+                entry.data = {'events': []}
+            have = {e['id'] for e in entry.data['events']}
+            entry.data['events'].extend(e for e in events if e['id'] not in have)
+            self._replay(uid)
+            self._push(uid, name, message, events)
+            return
+        except Exception as ex:
+            print(f'⚠️  Fitness push for {name} failed, kept in the WAL: {ex}')
+            return
+        self._unpushed.difference_update(e['id'] for e in events)
+        if not self._unpushed:
+            await self._wal_trim()
+        entry = file_cache[path]
+        if entry.data is not None and (len(entry.data['events']) >= JOURNAL_COMPACT_EVENTS
+                                       or len(entry.base_text or '') >= JOURNAL_COMPACT_BYTES):
+            self._compact_soon(uid)
+
+    async def _fill_index(self, uids: list[str]):
+        """Build leaderboard rows and index deadlines missing for uids, from the members' records."""
+        try:
+            index = file_cache[GITHUB_INDEX_PATH].data
+            for uid in uids:
+                record = await self._load(uid, PRIORITY_BACKGROUND)
+                if record is not None:
+                    record_saved(uid, record)
+                    index['users'][uid] = index_entry(record)
+            self._board_dirty = True
+            self._stage_board()
+            await write_behind.mark_dirty(GITHUB_INDEX_PATH, 'Add goal deadlines to the fitness index')
+            print(f'🏆 Rebuilt leaderboard rows and index entries for {len(uids)} member(s)')
+        except Exception as ex:
+            print(f'⚠️  Fitness index backfill stopped: {ex}')
+
+    def _stage_board(self) -> asyncio.Future | None:
+        """Queue the leaderboard file with every member's current row, if any changed since the last time."""
+        if not self._board_dirty:
+            return None
+        self._board_dirty = False
+        file_cache.setdefault(GITHUB_BOARD_PATH, CachedFile(GITHUB_BOARD_PATH)).data = {'rows': dict(leaderboard.rows)}
+        return write_behind.mark_dirty(GITHUB_BOARD_PATH, 'Update fitness leaderboard')
+
+    async def _flush_board_periodically(self):
+        """Rows change with nearly every edit, so they're committed on their own, slower timer."""
+        while True:
+            await asyncio.sleep(LEADERBOARD_FLUSH_S)
+            saved = self._stage_board()
+            if saved is not None:
+                try:
+                    await saved
+                except FitnessSaveError as ex:
+                    print(f'⚠️  Leaderboard commit failed: {ex}')
+
+    async def compact(self, uid: str) -> bool:
+        """
+        Fold uid's journal into a fresh shard snapshot, then drop the folded
+        events from the journal. Entries past the archive horizon move into
+        their year's archive file on the way. Archives land first, then the
+        snapshot, so if we stop in between the leftover events just replay
+        as no-ops (or put entries back that the next compaction re-archives).
+        """
+        record  = await self._load(uid, PRIORITY_BACKGROUND)
+        journal = file_cache[journal_path(uid)].data
+        if record is None:
+            return True
+        before = archive_cutoff()
+        cold   = split_archivable(record, before)
+        folded = {e['id'] for e in journal['events']} if journal else set()
+        if not folded and not cold:
+            return True
+        message = f'Compact fitness journal for {record["meta"].get("username", uid)}'
+        try:
+            for year, part in sorted(cold.items()):
+                path    = archive_path(uid, year)
+                archive = await gh_load(path, PRIORITY_BACKGROUND) or {}
+                file_cache[path].data = merge_archive(archive, part)
+                await write_behind.mark_dirty(path, f'Archive {year} fitness entries for '
+                                                    f'{record["meta"].get("username", uid)}')
+            snapshot = copy.deepcopy(record)
+            if cold:
+                snapshot['stats']       = [s for s in snapshot['stats'] if s['recorded_at'][:10] >= before]
+                snapshot['workout_log'] = [w for w in snapshot['workout_log'] if w['logged_at'][:10] >= before]
+                years = set((snapshot.get('archive') or {}).get('years', [])) | set(cold)
+                snapshot['archive'] = {'before': before, 'years': sorted(years)}
+            file_cache[user_path(uid)].data = snapshot
+            await write_behind.mark_dirty(user_path(uid), message)
+            if folded:
+                journal = file_cache[journal_path(uid)].data
+                journal['events'] = [e for e in journal['events'] if e['id'] not in folded]
+                await write_behind.mark_dirty(journal_path(uid), message)
+            return True
+        except FitnessSaveError:
+            return False
+
+    def _compact_soon(self, uid: str):
+        task = self._compactions.get(uid)
+        if task is None or task.done():
+            self._compactions[uid] = asyncio.create_task(self._compact_quietly(uid))
+
+    async def _compact_quietly(self, uid: str):
+        try:
+            if not await self.compact(uid):
+                print(f'⚠️  Compaction of {uid} deferred; it clashed with another change')
+        except Exception as ex:
+            print(f'⚠️  Compaction of {uid} failed: {ex}')
+
+    async def _compact_periodically(self):
+        while True:
+            await asyncio.sleep(JOURNAL_COMPACT_INTERVAL_S)
+            before = archive_cutoff()
+            for uid in list(self._replayed):
+                journal = file_cache[journal_path(uid)].data
+                if (journal and journal['events']) or split_archivable(self._replay(uid) or {}, before):
+                    await self._compact_quietly(uid)
+
+    async def set_baseline(self, member, unit, baseline):
+        return await self._edit(member, f'Baseline set for {member.name}',
+                                {'type': 'baseline_set', 'unit': unit, 'baseline': baseline})
+
+    async def append_stat(self, member, entry):
+        events: list[dict] = []
+
+        def settle(user_data):
+            events.extend(check_goals_after_update(user_data, record_index(str(member.id), user_data)))
+            return [goal_event_change(ev) for ev in events]
+
+        user_data = await self._edit(member, f'Stats updated for {member.name}',
+                                     {'type': 'stat_appended', 'entry': entry}, settle=settle)
+        return user_data, events
+
+    async def upsert_goal(self, member, goal):
+        return await self._edit(member, f'Goal updated for {member.name}',
+                                {'type': 'goal_upserted', 'goal': goal})
+
+    async def delete_goal(self, member, goal_id):
+        return await self._edit(member, f'Goal deleted for {member.name}',
+                                {'type': 'goal_deleted', 'goal_id': goal_id})
+
+    async def append_workout(self, member, entry):
+        return await self._edit(member, f'Workout log updated for {member.name}',
+                                {'type': 'workout_appended', 'entry': entry})
+
+    async def update_workout(self, member, entry_id, changes):
+        return await self._edit(member, f'Workout log updated for {member.name}',
+                                {'type': 'workout_edited', 'entry_id': entry_id, 'changes': changes})
+
+    async def delete_workout(self, member, entry_id):
+        return await self._edit(member, f'Workout deleted for {member.name}',
+                                {'type': 'workout_deleted', 'entry_id': entry_id})
+
+    async def upsert_note(self, member, ws, note):
+        return await self._edit(member, f'History note updated for {member.name}',
+                                {'type': 'note_upserted', 'week_start': ws, 'note': note})
+
+    async def set_privacy(self, member, is_public):
+        return await self._edit(member, f'Privacy updated for {member.name}',
+                                {'type': 'privacy_set', 'is_public': is_public})
+
+    async def set_digest(self, member, enabled):
+        return await self._edit(member, f'Weekly digest {"on" if enabled else "off"} for {member.name}',
+                                {'type': 'digest_set', 'enabled': enabled})
+
+    async def digest_records(self):
+        # Records live in per-member shards, so the digest can't be read off
+        # one file the way the leaderboard is: it takes a shard and journal
+        # per opted-in member. They're fetched DIGEST_LOAD_CONCURRENCY
+        # members at a time so a long opt-in list doesn't fill the
+        # background queue ahead of compaction and index upkeep.
+        self._check_connected()
+        index = await gh_load(GITHUB_INDEX_PATH, PRIORITY_BACKGROUND) or {'users': {}}
+        uids  = [uid for uid, e in index['users'].items() if e.get('digest') and e.get('is_public', True)]
+        limit = asyncio.Semaphore(DIGEST_LOAD_CONCURRENCY)
+
+        async def load(uid: str) -> dict | None:
+            async with limit:
+                return await self._load(uid, PRIORITY_BACKGROUND)
+
+        records = await asyncio.gather(*map(load, uids))
+        return {uid: r for uid, r in zip(uids, records)
+                if r is not None and r['meta'].get('weekly_digest') and r['meta'].get('is_public', True)}
+
+    async def mark_goal_reminded(self, member, goal_id, days):
+        return await self._edit(member, f'Goal reminder sent to {member.name}',
+                                {'type': 'goal_reminded', 'goal_id': goal_id, 'days': days})
+
+    async def goal_deadlines(self):
+        # The index lists each member's deadlines, so no shard needs loading.
+        index = file_cache[GITHUB_INDEX_PATH].data or {'users': {}}
+        return {uid: e['deadlines'] for uid, e in index['users'].items() if e.get('deadlines')}
+
+    async def import_records(self, member, changes):
+        return await self._edit(member, f'Imported fitness data for {member.name}', *changes)
+
+
+_STAT_COLUMNS = ['recorded_at', *GOAL_FIELDS, 'notes']
+
+SQLITE_SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS users (
+    uid       TEXT PRIMARY KEY,
+    is_public INTEGER NOT NULL DEFAULT 1,
+    meta      TEXT NOT NULL,
+    baseline  TEXT
+);
+CREATE INDEX IF NOT EXISTS users_public ON users(is_public);
+
+CREATE TABLE IF NOT EXISTS stats (
+    uid TEXT NOT NULL REFERENCES users(uid) ON DELETE CASCADE,
+    {', '.join(f'{c} {"REAL" if c in GOAL_FIELDS and c != "cardio_duration" else "TEXT"}' for c in _STAT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS stats_uid_time ON stats(uid, recorded_at);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id           TEXT PRIMARY KEY,
+    uid          TEXT NOT NULL REFERENCES users(uid) ON DELETE CASCADE,
+    field        TEXT NOT NULL,
+    target_date  TEXT,
+    completed_at TEXT,
+    created_at   TEXT,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS goals_uid ON goals(uid, created_at);
+
+CREATE TABLE IF NOT EXISTS workout_log (
+    id        TEXT PRIMARY KEY,
+    uid       TEXT NOT NULL REFERENCES users(uid) ON DELETE CASCADE,
+    logged_at TEXT NOT NULL,
+    category  TEXT,
+    workout   TEXT NOT NULL,
+    details   TEXT
+);
+CREATE INDEX IF NOT EXISTS workout_uid_time ON workout_log(uid, logged_at);
+
+CREATE TABLE IF NOT EXISTS history_notes (
+    uid        TEXT NOT NULL REFERENCES users(uid) ON DELETE CASCADE,
+    week_start TEXT NOT NULL,
+    note       TEXT NOT NULL,
+    PRIMARY KEY (uid, week_start)
+);
+'''
+
+
+class SQLiteStore(FitnessStore):
+    """
+    Local SQLite database in WAL mode with row-level writes. All access runs
+    on one dedicated thread, so the connection never crosses threads and
+    the event loop never blocks on disk.
+    """
+    def __init__(self, path: str, import_path: str = ''):
+        self.path        = path
+        self.import_path = import_path
+        self._db: sqlite3.Connection | None = None
+        self._thread     = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fitness-sqlite')
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread, fn, *args)
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+    async def open(self):
+        await self._run(self._open)
+        leaderboard.seed(await self._run(self._board_rows))
+        for uid, goals in (await self.goal_deadlines()).items():
+            goal_reminders.sync(uid, goals)
+
+    async def close(self):
+        await self._run(self._close)
+
+    def _open(self):
+        self._db = sqlite3.connect(self.path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('PRAGMA foreign_keys=ON')
+        self._db.executescript(SQLITE_SCHEMA)
+        empty = self._db.execute('SELECT 1 FROM users LIMIT 1').fetchone() is None
+        if empty and self.import_path and os.path.exists(self.import_path):
+            with open(self.import_path, encoding='utf-8') as fh:
+                users = json.load(fh).get('users', {})
+            self.import_users(users)
+            print(f'🗄️  Imported {len(users)} fitness profile(s) from {self.import_path}')
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def import_users(self, users: dict):
+        """Load users in the JSON document schema ({uid: record}) in one transaction."""
+        with self._db:
+            for uid, u in users.items():
+                self._db.execute(
+                    'INSERT OR REPLACE INTO users (uid, is_public, meta, baseline) VALUES (?, ?, ?, ?)',
+                    (uid, int(u['meta'].get('is_public', True)), json.dumps(u['meta']),
+                     json.dumps(u['baseline']) if u.get('baseline') is not None else None),
+                )
+                for s in u.get('stats', []):
+                    self._insert_stat(uid, s)
+                for g in u.get('goals', []):
+                    self._write_goal(uid, g)
+                for w in u.get('workout_log', []):
+                    self._write_workout(uid, w)
+                for n in u.get('history_notes', []):
+                    self._write_note(uid, n['week_start'], n['note'])
+
+    # ── row helpers (DB thread only) ─────────────────────────────────────────
+    def _ensure_user(self, member):
+        record = new_user_record(member)
+        self._db.execute(
+            'INSERT OR IGNORE INTO users (uid, is_public, meta) VALUES (?, ?, ?)',
+            (str(member.id), int(record['meta']['is_public']), json.dumps(record['meta'])),
+        )
+
+    def _insert_stat(self, uid: str, entry: dict):
+        self._db.execute(
+            f'INSERT INTO stats (uid, {", ".join(_STAT_COLUMNS)}) VALUES (?{", ?" * len(_STAT_COLUMNS)})',
+            (uid, *(entry.get(c) for c in _STAT_COLUMNS)),
+        )
+
+    def _write_goal(self, uid: str, goal: dict):
+        self._db.execute(
+            'INSERT OR REPLACE INTO goals (id, uid, field, target_date, completed_at, created_at, data) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (goal['id'], uid, goal['field'], goal.get('target_date'), goal.get('completed_at'),
+             goal.get('created_at'), json.dumps(goal)),
+        )
+
+    def _write_workout(self, uid: str, entry: dict):
+        self._db.execute(
+            'INSERT OR REPLACE INTO workout_log (id, uid, logged_at, category, workout, details) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (entry['id'], uid, entry['logged_at'], entry.get('category'), entry['workout'], entry.get('details')),
+        )
+
+    def _write_note(self, uid: str, ws: str, note: str):
+        self._db.execute(
+            'INSERT INTO history_notes (uid, week_start, note) VALUES (?, ?, ?) '
+            'ON CONFLICT (uid, week_start) DO UPDATE SET note = excluded.note',
+            (uid, ws, note),
+        )
+
+    def _update_meta(self, uid: str, **changes):
+        row  = self._db.execute('SELECT meta FROM users WHERE uid = ?', (uid,)).fetchone()
+        meta = {**json.loads(row['meta']), **changes}
+        self._db.execute(
+            'UPDATE users SET meta = ?, is_public = ? WHERE uid = ?',
+            (json.dumps(meta), int(meta.get('is_public', True)), uid),
+        )
+
+    def _user(self, uid: str) -> dict | None:
+        """uid's record with stats and workouts inside the archive horizon; older years are listed under 'archive'."""
+        db     = self._db
+        before = archive_cutoff()
+        row    = db.execute('SELECT meta, baseline FROM users WHERE uid = ?', (uid,)).fetchone()
+        if row is None:
+            return None
+        years = sorted({int(r[0]) for r in db.execute(
+            'SELECT DISTINCT substr(recorded_at, 1, 4) FROM stats WHERE uid = ? AND recorded_at < ? '
+            'UNION SELECT DISTINCT substr(logged_at, 1, 4) FROM workout_log WHERE uid = ? AND logged_at < ?',
+            (uid, before, uid, before),
+        )})
+        return {
+            'meta':     json.loads(row['meta']),
+            'baseline': json.loads(row['baseline']) if row['baseline'] else None,
+            'goals': [
+                json.loads(r['data'])
+                for r in db.execute('SELECT data FROM goals WHERE uid = ? ORDER BY created_at, rowid', (uid,))
+            ],
+            'stats':       self._stats(uid, before),
+            'workout_log': self._workouts(uid, before),
+            'history_notes': [
+                {'week_start': r['week_start'], 'note': r['note']}
+                for r in db.execute('SELECT week_start, note FROM history_notes WHERE uid = ? ORDER BY week_start', (uid,))
+            ],
+            'archive': {'before': before, 'years': years} if years else None,
+        }
+
+    def _stats(self, uid: str, lo: str, hi: str = '~') -> list[dict]:
+        """uid's stats recorded in [lo, hi), oldest first."""
+        return [
+            {c: r[c] for c in _STAT_COLUMNS}
+            for r in self._db.execute(
+                'SELECT * FROM stats WHERE uid = ? AND recorded_at >= ? AND recorded_at < ? ORDER BY recorded_at, rowid',
+                (uid, lo, hi))
+        ]
+
+    def _workouts(self, uid: str, lo: str, hi: str = '~') -> list[dict]:
+        """uid's workouts logged in [lo, hi), oldest first."""
+        return [
+            {k: r[k] for k in ('id', 'logged_at', 'category', 'workout', 'details')}
+            for r in self._db.execute(
+                'SELECT * FROM workout_log WHERE uid = ? AND logged_at >= ? AND logged_at < ? ORDER BY logged_at, rowid',
+                (uid, lo, hi))
+        ]
+
+    def _archive(self, uid: str, year: int) -> dict | None:
+        hi   = min(f'{year + 1}', archive_cutoff())
+        part = {'stats': self._stats(uid, f'{year}', hi), 'workout_log': self._workouts(uid, f'{year}', hi)}
+        return part if part['stats'] or part['workout_log'] else None
+
+    def _board_rows(self) -> dict[str, dict]:
+        """Every member's leaderboard row, built once at startup; edits keep them current after that."""
+        uids = [r['uid'] for r in self._db.execute('SELECT uid FROM users')]
+        return {uid: board_row(RecordIndex(self._user(uid))) for uid in uids}
+
+    def _write(self, member, fn, *args):
+        """Run fn(uid, *args) in a transaction for member, then return their record."""
+        uid = str(member.id)
+        with self._db:
+            self._ensure_user(member)
+            fn(uid, *args)
+        return self._user(uid)
+
+    def _append_stat(self, member, entry: dict) -> tuple[dict, list[dict]]:
+        uid = str(member.id)
+        with self._db:
+            self._ensure_user(member)
+            self._insert_stat(uid, entry)
+            user_data = self._user(uid)
+            events    = check_goals_after_update(user_data)
+            for goal in {id(ev['goal']): ev['goal'] for ev in events}.values():
+                self._write_goal(uid, goal)
+        return user_data, events
+
+    # ── FitnessStore ──────────────────────────────────────────────────────────
+    async def load_user(self, uid):
+        return await self._run(self._user, uid)
+
+    async def load_archive(self, uid, year):
+        return await self._run(self._archive, uid, year)
+
+    async def _edit(self, member, fn, *args) -> dict:
+        record = await self._run(self._write, member, fn, *args)
+        record_saved(str(member.id), record)
+        return record
+
+    async def set_baseline(self, member, unit, baseline):
+        def op(uid):
+            self._update_meta(uid, unit_preference=unit)
+            self._db.execute('UPDATE users SET baseline = ? WHERE uid = ?', (json.dumps(baseline), uid))
+        return await self._edit(member, op)
+
+    async def append_stat(self, member, entry):
+        user_data, events = await self._run(self._append_stat, member, entry)
+        record_saved(str(member.id), user_data)
+        return user_data, events
+
+    async def upsert_goal(self, member, goal):
+        def op(uid):
+            row = self._db.execute('SELECT data FROM goals WHERE id = ? AND uid = ?', (goal['id'], uid)).fetchone()
+            self._write_goal(uid, {**json.loads(row['data']), **goal} if row else goal)
+        return await self._edit(member, op)
+
+    async def delete_goal(self, member, goal_id):
+        def op(uid):
+            self._db.execute('DELETE FROM goals WHERE id = ? AND uid = ?', (goal_id, uid))
+        return await self._edit(member, op)
+
+    async def append_workout(self, member, entry):
+        return await self._edit(member, self._write_workout, entry)
+
+    async def update_workout(self, member, entry_id, changes):
+        def op(uid):
+            cols = [c for c in ('category', 'workout', 'details') if c in changes]
+            if cols:
+                self._db.execute(
+                    f'UPDATE workout_log SET {", ".join(f"{c} = ?" for c in cols)} WHERE id = ? AND uid = ?',
+                    (*(changes[c] for c in cols), entry_id, uid),
+                )
+        return await self._edit(member, op)
+
+    async def delete_workout(self, member, entry_id):
+        def op(uid):
+            self._db.execute('DELETE FROM workout_log WHERE id = ? AND uid = ?', (entry_id, uid))
+        return await self._edit(member, op)
+
+    async def upsert_note(self, member, ws, note):
+        return await self._edit(member, self._write_note, ws, note)
+
+    async def set_privacy(self, member, is_public):
+        def op(uid):
+            self._update_meta(uid, is_public=is_public)
+        return await self._edit(member, op)
+
+    async def set_digest(self, member, enabled):
+        def op(uid):
+            self._update_meta(uid, weekly_digest=enabled)
+        return await self._edit(member, op)
+
+    async def digest_records(self):
+        def load():
+            rows = self._db.execute(
+                "SELECT uid FROM users WHERE is_public = 1 AND json_extract(meta, '$.weekly_digest') = 1")
+            return {r['uid']: self._user(r['uid']) for r in rows.fetchall()}
+        return await self._run(load)
+
+    async def mark_goal_reminded(self, member, goal_id, days):
+        def op(uid):
+            row = self._db.execute('SELECT data FROM goals WHERE id = ? AND uid = ?', (goal_id, uid)).fetchone()
+            if row is not None:
+                goal = json.loads(row['data'])
+                if days not in goal.setdefault('reminders_sent', []):
+                    goal['reminders_sent'].append(days)
+                    self._write_goal(uid, goal)
+        return await self._edit(member, op)
+
+    async def goal_deadlines(self):
+        def load():
+            out: dict[str, list[dict]] = {}
+            for r in self._db.execute("SELECT uid, data FROM goals WHERE completed_at IS NULL AND "
+                                      "COALESCE(target_date, '') != ''"):
+                out.setdefault(r['uid'], []).append(json.loads(r['data']))
+            return out
+        return await self._run(load)
+
+    async def import_records(self, member, changes):
+        def op(uid):
+            for change in changes:
+                kind = change['type']
+                if kind == 'stats_imported':
+                    have = {r['recorded_at'] for r in self._db.execute('SELECT recorded_at FROM stats WHERE uid = ?', (uid,))}
+                    for entry in change['entries']:
+                        if entry['recorded_at'] not in have:
+                            self._insert_stat(uid, entry)
+                elif kind == 'workout_appended':
+                    self._write_workout(uid, change['entry'])
+                elif kind == 'goal_upserted':
+                    goal = change['goal']
+                    row  = self._db.execute('SELECT data FROM goals WHERE id = ? AND uid = ?', (goal['id'], uid)).fetchone()
+                    self._write_goal(uid, {**json.loads(row['data']), **goal} if row else goal)
+                elif kind == 'note_upserted':
+                    self._write_note(uid, change['week_start'], change['note'])
+        return await self._edit(member, op)
+
+
+def make_store() -> FitnessStore:
+    if FITNESS_BACKEND == 'sqlite':
+        return SQLiteStore(FITNESS_SQLITE_PATH, FITNESS_SQLITE_IMPORT)
+    return GitHubStore()
+
+
+storage: FitnessStore = make_store()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  Embed Builders
@@ -281,14 +2458,19 @@ def build_goals_embed(user_data: dict, member: discord.Member | discord.User) ->
         return e
     for g in goals:
         fl       = GOAL_FIELDS.get(g['field'], {}).get('label', g['field'])
-        status   = '✅ Completed' if g.get('completed_at') else '🔄 In Progress'
+        deadline = goal_deadline(g)
+        if g.get('completed_at'):
+            status = '✅ Completed'
+        elif deadline is not None and deadline.date() < datetime.now(timezone.utc).date():
+            status = f'⏰ Overdue ({(datetime.now(timezone.utc) - deadline).days} days)'
+        else:
+            status = '🔄 In Progress'
         val_disp = fmt_stat(g['field'], g['target_value'], user_data)
         lines    = [f'**Target:** {val_disp}', f'**By:** {g.get("target_date","No date")}', f'**Status:** {status}']
         if g.get('milestone_pct'):
-            lines.append(f'**Milestones:** every {g["milestone_pct"]}%')
-        if g.get('milestones_announced'):
-            reached = ', '.join(f'{int(p)}%' for p in sorted(g['milestones_announced']))
-            lines.append(f'**Reached:** {reached}')
+            lines.append(f'**Milestones:** every {float(g["milestone_pct"]):g}%')
+        if reached := milestone_reached(g):
+            lines.append(f'**Reached:** {reached:g}%')
         e.add_field(name=f'🎯 {fl}', value='\n'.join(lines), inline=False)
     return e
 
@@ -297,20 +2479,18 @@ def build_history_embed(
     user_data: dict,
     member: discord.Member | discord.User,
     ws: str,
+    week: tuple[list[dict], list[dict], dict | None] | None = None,
 ) -> discord.Embed:
+    """week is history_week's (stats, workouts, note); without it only the hot record is shown."""
     ws_dt  = datetime.strptime(ws, '%Y-%m-%d').replace(tzinfo=timezone.utc)
     we_dt  = ws_dt + timedelta(days=6)
-    we_str = we_dt.strftime('%Y-%m-%d')
     label  = f'{ws_dt.strftime("%b %d")} – {we_dt.strftime("%b %d, %Y")}'
     e      = discord.Embed(
         title=f'📅 {member.display_name} — Week of {label}',
         color=discord.Color.teal(),
     )
+    stats_week, workouts, note_entry = week or record_index(str(member.id), user_data).week(ws)
     # Stat updates this week
-    stats_week = [
-        s for s in user_data.get('stats', [])
-        if ws <= s['recorded_at'][:10] <= we_str
-    ]
     if stats_week:
         lines = []
         for s in stats_week:
@@ -324,10 +2504,6 @@ def build_history_embed(
         e.add_field(name='📊 Stat Updates', value='None this week', inline=False)
 
     # Workouts this week
-    workouts = [
-        w for w in user_data.get('workout_log', [])
-        if ws <= w['logged_at'][:10] <= we_str
-    ]
     if workouts:
         lines = [
             f'**{w["logged_at"][:10]}** [{w.get("category","?")}] {w["workout"]}'
@@ -338,9 +2514,6 @@ def build_history_embed(
         e.add_field(name='🏋️ Workouts', value='None logged this week', inline=False)
 
     # Note
-    note_entry = next(
-        (n for n in user_data.get('history_notes', []) if n['week_start'] == ws), None
-    )
     e.add_field(
         name='📝 Note',
         value=note_entry['note'] if note_entry else 'No note for this week.',
@@ -348,20 +2521,198 @@ def build_history_embed(
     )
     return e
 
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Render Cache
+# ═══════════════════════════════════════════════════════════════════════════════
+class ByteLRU:
+    """
+    Least-recently-used cache bounded by the total size of its values, not
+    their count. size(value) defaults to len(); a value bigger than the
+    whole budget is simply not kept.
+    """
+    def __init__(self, max_bytes: int, size=len):
+        self.max_bytes = max_bytes
+        self.size      = size
+        self.bytes     = 0
+        self.hits      = 0
+        self.misses    = 0
+        self._items: OrderedDict = OrderedDict()   # key → (value, size), oldest first
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key, default=None):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, value):
+        n = self.size(value)
+        if key in self._items:
+            self.bytes -= self._items.pop(key)[1]
+        if n > self.max_bytes:
+            return
+        self._items[key] = (value, n)
+        self.bytes += n
+        while self.bytes > self.max_bytes:
+            self.bytes -= self._items.popitem(last=False)[1][1]
+
+    def status(self) -> str:
+        return (f'{len(self._items)} items · {self.bytes / 1024:.0f} / {self.max_bytes / 1024:.0f} KiB · '
+                f'{self.hits} hits / {self.misses} misses')
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Progress Charts
+# ═══════════════════════════════════════════════════════════════════════════════
+chart_cache = ByteLRU(CHART_CACHE_BYTES)
+chart_pool  = ThreadPoolExecutor(max_workers=CHART_THREADS, thread_name_prefix='chart')
+
+CHART_BG       = (43, 45, 49)
+CHART_GRID     = (70, 73, 79)
+CHART_TEXT     = (220, 221, 222)
+CHART_LINE     = (88, 101, 242)
+CHART_BASELINE = (150, 150, 150)
+CHART_TARGET   = (241, 196, 15)
+CHART_WEEK     = (60, 64, 72)
+
+
+def render_progress_chart(panels: list[dict], week: tuple[float, float] | None) -> bytes:
+    """
+    One small line chart per panel, two to a row, as PNG bytes. A panel is
+    {title, times, values, baseline, targets}; baseline is drawn dashed
+    grey, targets gold, and week (epoch start, end) is shaded. Pure Pillow,
+    safe to run off the event loop.
+    """
+    pw, ph = CHART_PANEL_SIZE
+    cols   = 1 if len(panels) == 1 else 2
+    rows   = math.ceil(len(panels) / cols)
+    canvas = Image.new('RGB', (pw * cols, ph * rows), CHART_BG)
+    draw   = ImageDraw.Draw(canvas)
+    font   = ImageFont.load_default(size=13)
+    left, right, top, bottom = 52, 12, 26, 22
+
+    for n, p in enumerate(panels):
+        ox, oy   = (n % cols) * pw, (n // cols) * ph
+        x0, y0   = ox + left, oy + top
+        x1, y1   = ox + pw - right, oy + ph - bottom
+        times    = p['times']
+        t_lo, t_hi = times[0], times[-1]
+        if t_hi - t_lo < 86400:
+            t_lo, t_hi = t_lo - 86400, t_hi + 86400
+        levels   = [*p['values'], *([p['baseline']] if p['baseline'] is not None else []), *p['targets']]
+        v_lo, v_hi = min(levels), max(levels)
+        pad      = (v_hi - v_lo) * 0.08 or max(abs(v_hi) * 0.05, 1.0)
+        v_lo, v_hi = v_lo - pad, v_hi + pad
+
+        def xy(t: float, v: float) -> tuple[float, float]:
+            return (x0 + (t - t_lo) / (t_hi - t_lo) * (x1 - x0),
+                    y1 - (v - v_lo) / (v_hi - v_lo) * (y1 - y0))
+
+        if week is not None and week[1] >= t_lo and week[0] <= t_hi:
+            wx0, _ = xy(max(week[0], t_lo), v_lo)
+            wx1, _ = xy(min(week[1], t_hi), v_lo)
+            draw.rectangle((wx0, y0, max(wx1, wx0 + 2), y1), fill=CHART_WEEK)
+        draw.rectangle((x0, y0, x1, y1), outline=CHART_GRID)
+        draw.text((ox + 8, oy + 6), p['title'], font=font, fill=CHART_TEXT)
+        for v in (v_lo + pad, v_hi - pad):
+            _, y = xy(t_lo, v)
+            draw.line((x0, y, x1, y), fill=CHART_GRID)
+            draw.text((ox + 4, y - 7), f'{v:.4g}', font=font, fill=CHART_TEXT)
+        for t, anchor in ((t_lo, 'la'), (t_hi, 'ra')):
+            x, _ = xy(t, v_lo)
+            label = datetime.fromtimestamp(t, timezone.utc).strftime('%b %d')
+            draw.text((x, y1 + 4), label, font=font, fill=CHART_TEXT, anchor=anchor)
+
+        for level, color in ([(p['baseline'], CHART_BASELINE)] if p['baseline'] is not None else []) + \
+                            [(t, CHART_TARGET) for t in p['targets']]:
+            _, y = xy(t_lo, level)
+            for x in range(int(x0), int(x1), 10):
+                draw.line((x, y, min(x + 5, x1), y), fill=color, width=2)
+
+        points = [xy(t, v) for t, v in zip(times, p['values'])]
+        if len(points) > 1:
+            draw.line(points, fill=CHART_LINE, width=2)
+        for x, y in points[-60:]:
+            draw.ellipse((x - 2.5, y - 2.5, x + 2.5, y + 2.5), fill=CHART_LINE)
+
+    out = BytesIO()
+    canvas.save(out, format='PNG', optimize=True)
+    return out.getvalue()
+
+
+async def progress_chart(uid: str, user_data: dict, week: str | None = None) -> bytes | None:
+    """
+    uid's progress chart: every GOAL_FIELDS metric they've recorded, with
+    baseline and active goal targets, week (YYYY-MM-DD Sunday) shaded if
+    given. Cached by a hash of exactly what gets drawn, so reopening a view
+    or publishing reuses the PNG; None if there are no stats to plot.
+    """
+    index  = record_index(uid, user_data)
+    series = index.series
+    fields = [f for f in GOAL_FIELDS if 1 in series.present[f]]
+    if not fields:
+        return None
+    targets = {f: sorted({spec.target for spec in index.goals
+                          if spec.field == f and spec.target is not None and not spec.goal.get('completed_at')})
+               for f in fields}
+    titles  = {f: f'{GOAL_FIELDS[f]["label"]} ({"min" if f == "cardio_duration" else unit_label(user_data, f)})'
+               for f in fields}
+    span    = None
+    if week is not None:
+        start = datetime.strptime(week, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+        span  = (start, start + 7 * 86400)
+
+    key = hashlib.sha256()
+    key.update(series.times.tobytes())
+    for f in fields:
+        key.update(series.columns[f].tobytes())
+        key.update(bytes(series.present[f]))
+    key.update(repr((fields, [getattr(index.baseline, f) for f in fields], targets, titles,
+                     span, CHART_PANEL_SIZE)).encode())
+    key = key.hexdigest()
+    png = chart_cache.get(key)
+    if png is None:
+        panels = []
+        for f in fields:
+            ts, vs = series.points(f)
+            panels.append({'title': titles[f], 'times': list(ts), 'values': list(vs),
+                           'baseline': getattr(index.baseline, f), 'targets': targets[f]})
+        png = await asyncio.get_running_loop().run_in_executor(chart_pool, render_progress_chart, panels, span)
+        chart_cache.put(key, png)
+    return png
+
+
+def chart_file(png: bytes) -> discord.File:
+    return discord.File(BytesIO(png), filename=CHART_FILENAME)
+
+
+async def attach_chart(embed: discord.Embed, uid: str, user_data: dict, week: str | None = None) -> bytes | None:
+    """Point embed's image at uid's progress chart and return the PNG to send with it (None: no chart)."""
+    png = await progress_chart(uid, user_data, week)
+    if png is not None:
+        embed.set_image(url=f'attachment://{CHART_FILENAME}')
+    return png
+
 # ═══════════════════════════════════════════════════════════════════════════════
 #  Shared PublishView
 # ═══════════════════════════════════════════════════════════════════════════════
 class PublishView(discord.ui.View):
-    """Reusable ephemeral → channel publish button."""
-    def __init__(self, embed: discord.Embed, guild: discord.Guild):
+    """Reusable ephemeral → channel publish button. chart is the PNG the embed's image points at, if any."""
+    def __init__(self, embed: discord.Embed, guild: discord.Guild, chart: bytes | None = None):
         super().__init__(timeout=300)
         self.embed = embed
         self.guild = guild
+        self.chart = chart
 
     @discord.ui.button(label='📢 Publish to Channel', style=discord.ButtonStyle.secondary)
     async def publish(self, interaction: discord.Interaction, button: discord.ui.Button):
         mention = fitness_role_mention(self.guild)
-        await interaction.channel.send(content=mention, embed=self.embed)
+        files   = [chart_file(self.chart)] if self.chart else []
+        await interaction.channel.send(content=mention, embed=self.embed, files=files)
         button.disabled = True
         await interaction.response.edit_message(view=self)
 
@@ -468,10 +2819,6 @@ class BaselineModal2(discord.ui.Modal, title='Baseline — Part 2 of 2'):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            user_data['meta']['unit_preference'] = self.unit
-
             baseline = {
                 'set_at':             utcnow(),
                 'weight':             parse_num(self.part1.get('weight')),
@@ -484,8 +2831,7 @@ class BaselineModal2(discord.ui.Modal, title='Baseline — Part 2 of 2'):
                 'cardio_duration':    self.cardio_duration.value.strip() or None,
                 'notes':              self.notes.value.strip() or None,
             }
-            user_data['baseline'] = baseline
-            await gh_save(data, sha, f'Baseline set for {interaction.user.name}')
+            user_data = await storage.set_baseline(interaction.user, self.unit, baseline)
 
             embed = build_baseline_embed(user_data, interaction.user)
             view  = PublishView(embed=embed, guild=interaction.guild)
@@ -568,26 +2914,22 @@ class GoalModal(discord.ui.Modal, title='Set Fitness Goal'):
             self.target_date.default   = str(editing_goal.get('target_date', ''))
             mp = editing_goal.get('milestone_pct')
             if mp is not None:
-                self.milestone_pct.default = str(int(mp)) if mp == int(mp) else str(mp)
+                self.milestone_pct.default = f'{float(mp):g}'
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            mp_raw = self.milestone_pct.value.strip()
-            mp     = float(mp_raw) if mp_raw else None
-
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
+            mp = parse_milestone_pct(self.milestone_pct.value)
 
             if self.editing_goal:
-                for g in user_data['goals']:
-                    if g['id'] == self.editing_goal['id']:
-                        g['target_value']  = self.target_value.value.strip()
-                        g['target_date']   = self.target_date.value.strip()
-                        g['milestone_pct'] = mp
-                        break
+                goal = {
+                    'id':            self.editing_goal['id'],
+                    'target_value':  self.target_value.value.strip(),
+                    'target_date':   self.target_date.value.strip(),
+                    'milestone_pct': mp,
+                }
             else:
-                user_data['goals'].append({
+                goal = {
                     'id':                    str(uuid.uuid4()),
                     'label':                 GOAL_FIELDS[self.field]['label'],
                     'field':                 self.field,
@@ -597,10 +2939,11 @@ class GoalModal(discord.ui.Modal, title='Set Fitness Goal'):
                     'milestone_pct':         mp,
                     'created_at':            utcnow(),
                     'completed_at':          None,
-                    'milestones_announced':  [],
-                })
+                    'milestone_k':           0,
+                    'milestone_step':        mp,
+                }
+            user_data = await storage.upsert_goal(interaction.user, goal)
 
-            await gh_save(data, sha, f'Goal updated for {interaction.user.name}')
             embed = build_goals_embed(user_data, interaction.user)
             view  = GoalsManageView(user_data, interaction.user)
             await interaction.followup.send('✅ Goal saved!', embed=embed, view=view, ephemeral=True)
@@ -651,10 +2994,11 @@ class GoalActionSelect(discord.ui.Select):
             )
         else:
             await interaction.response.defer(ephemeral=True)
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            user_data['goals'] = [g for g in user_data['goals'] if g['id'] != goal_id]
-            await gh_save(data, sha, f'Goal deleted for {interaction.user.name}')
+            try:
+                user_data = await storage.delete_goal(interaction.user, goal_id)
+            except Exception as ex:
+                await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+                return
             embed = build_goals_embed(user_data, interaction.user)
             view  = GoalsManageView(user_data, interaction.user)
             await interaction.followup.send('🗑️ Goal deleted.', embed=embed, view=view, ephemeral=True)
@@ -670,9 +3014,12 @@ class StatsMainView(discord.ui.View):
 
     @discord.ui.button(label='📊 View Stats', style=discord.ButtonStyle.secondary, row=0)
     async def view_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True, thinking=True)
         embed = build_stats_embed(self.user_data, self.member)
-        view  = PublishView(embed=embed, guild=interaction.guild)
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        chart = await attach_chart(embed, str(self.member.id), self.user_data) if self.user_data.get('stats') else None
+        view  = PublishView(embed=embed, guild=interaction.guild, chart=chart)
+        await interaction.followup.send(embed=embed, view=view, files=[chart_file(chart)] if chart else [],
+                                        ephemeral=True)
 
     @discord.ui.button(label='✏️ Update Stats', style=discord.ButtonStyle.primary, row=0)
     async def update_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -752,9 +3099,8 @@ class StatsModal2(discord.ui.Modal, title='Update Stats — Part 2 of 2'):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            prev      = user_data['stats'][-1] if user_data.get('stats') else {}
+            current = await storage.load_user(str(interaction.user.id))
+            prev    = current['stats'][-1] if current and current.get('stats') else {}
 
             def n(raw: str | None, key: str) -> float | None:
                 s = (raw or '').strip()
@@ -779,15 +3125,14 @@ class StatsModal2(discord.ui.Modal, title='Update Stats — Part 2 of 2'):
                 'cardio_duration':    cd(self.cardio_duration.value,    'cardio_duration'),
                 'notes':              self.notes.value.strip() or None,
             }
-            user_data['stats'].append(entry)
-
-            # Check goals before saving
-            events = check_goals_after_update(user_data)
-            await gh_save(data, sha, f'Stats updated for {interaction.user.name}')
+            # Appending also settles goals against the new snapshot
+            user_data, events = await storage.append_stat(interaction.user, entry)
 
             embed = build_stats_embed(user_data, interaction.user, entry)
-            view  = PublishView(embed=embed, guild=interaction.guild)
-            await interaction.followup.send('✅ **Stats updated!**', embed=embed, view=view, ephemeral=True)
+            chart = await attach_chart(embed, str(interaction.user.id), user_data)
+            view  = PublishView(embed=embed, guild=interaction.guild, chart=chart)
+            await interaction.followup.send('✅ **Stats updated!**', embed=embed, view=view,
+                                            files=[chart_file(chart)] if chart else [], ephemeral=True)
 
             # Surface any goal achievements
             if events:
@@ -797,7 +3142,7 @@ class StatsModal2(discord.ui.Modal, title='Update Stats — Part 2 of 2'):
                     if ev['type'] == 'completed':
                         lines.append(f'🏆 You completed your **{fl}** goal!')
                     else:
-                        lines.append(f'🎉 **{int(ev["milestone_pct"])}%** milestone hit for **{fl}**!')
+                        lines.extend(milestone_lines(fl, ev['step'], ev['from_k'], ev['to_k']))
 
                 achievement_embed = discord.Embed(
                     title=f'🏆 {interaction.user.display_name} — Fitness Achievement!',
@@ -824,6 +3169,8 @@ class HistoryView(discord.ui.View):
         self.user_data = user_data
         self.member    = member
         self.ws        = ws  # YYYY-MM-DD of the Sunday
+        self.chart: bytes | None = None   # what the message's embed image currently shows
+        self.week:  tuple | None = None   # history_week for self.ws, archived entries included
 
     @discord.ui.button(label='◀ Prev Week', style=discord.ButtonStyle.secondary, row=0)
     async def prev_week(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -843,27 +3190,40 @@ class HistoryView(discord.ui.View):
 
     @discord.ui.button(label='📝 Add / Edit Note', style=discord.ButtonStyle.primary, row=1)
     async def add_note(self, interaction: discord.Interaction, button: discord.ui.Button):
-        existing = next(
-            (n for n in self.user_data.get('history_notes', []) if n['week_start'] == self.ws), None
-        )
+        _, _, existing = record_index(str(self.member.id), self.user_data).week(self.ws)
         await interaction.response.send_modal(
             HistoryNoteModal(ws=self.ws, existing_note=existing['note'] if existing else '')
         )
 
     @discord.ui.button(label='📢 Publish to Channel', style=discord.ButtonStyle.secondary, row=1)
     async def publish(self, interaction: discord.Interaction, button: discord.ui.Button):
-        embed   = build_history_embed(self.user_data, self.member, self.ws)
+        embed   = build_history_embed(self.user_data, self.member, self.ws, self.week)
+        files   = []
+        if self.chart:
+            embed.set_image(url=f'attachment://{CHART_FILENAME}')
+            files.append(chart_file(self.chart))
         mention = fitness_role_mention(interaction.guild)
-        await interaction.channel.send(content=mention, embed=embed)
+        await interaction.channel.send(content=mention, embed=embed, files=files)
         button.disabled = True
         await interaction.response.edit_message(view=self)
 
+    async def render(self) -> dict:
+        """The message fields for the current week, chart included. Older weeks may fetch an archive."""
+        self.week  = await history_week(str(self.member.id), self.user_data, self.ws)
+        embed      = build_history_embed(self.user_data, self.member, self.ws, self.week)
+        self.chart = await attach_chart(embed, str(self.member.id), self.user_data, self.ws)
+        return {'embed': embed, 'view': self, 'attachments': [chart_file(self.chart)] if self.chart else []}
+
     async def _refresh(self, interaction: discord.Interaction):
-        data, _   = await gh_load()
-        user_data = ensure_user(data, interaction.user)
-        self.user_data = user_data
-        embed = build_history_embed(user_data, self.member, self.ws)
-        await interaction.response.edit_message(embed=embed, view=self)
+        # Paging works off the record we already hold and its week index; no
+        # reload. Only weeks past the archive horizon fetch anything.
+        await interaction.response.defer()
+        try:
+            fields = await self.render()
+        except Exception as ex:
+            await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+            return
+        await interaction.edit_original_response(**fields)
 
 
 class HistoryNoteModal(discord.ui.Modal, title='Weekly Note'):
@@ -883,18 +3243,10 @@ class HistoryNoteModal(discord.ui.Modal, title='Weekly Note'):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            notes     = user_data.setdefault('history_notes', [])
-            existing  = next((n for n in notes if n['week_start'] == self.ws), None)
-            if existing:
-                existing['note'] = self.note.value.strip()
-            else:
-                notes.append({'week_start': self.ws, 'note': self.note.value.strip()})
-            await gh_save(data, sha, f'History note updated for {interaction.user.name}')
-            embed = build_history_embed(user_data, interaction.user, self.ws)
-            view  = HistoryView(user_data, interaction.user, self.ws)
-            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            user_data = await storage.upsert_note(interaction.user, self.ws, self.note.value.strip())
+            fields = await HistoryView(user_data, interaction.user, self.ws).render()
+            await interaction.followup.send(embed=fields['embed'], view=fields['view'],
+                                            files=fields['attachments'], ephemeral=True)
         except Exception as ex:
             await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
 
@@ -906,11 +3258,11 @@ def build_workout_log_page(
     member: discord.Member | discord.User,
     page: int,
 ) -> tuple[discord.Embed, 'WorkoutLogPageView']:
-    logs      = sorted(user_data.get('workout_log', []), key=lambda x: x['logged_at'], reverse=True)
-    total     = len(logs)
+    index     = record_index(str(member.id), user_data)
+    total     = len(index.workout_order)
     max_page  = max(0, (total - 1) // PAGE_SIZE) if total else 0
     page      = max(0, min(page, max_page))
-    chunk     = logs[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    chunk, _  = index.workout_page(page, PAGE_SIZE)
 
     e = discord.Embed(
         title=f'🏋️ {member.display_name} — Workout Log',
@@ -923,7 +3275,7 @@ def build_workout_log_page(
             value=(w.get('details') or '')[:256],
             inline=False,
         )
-    view = WorkoutLogPageView(user_data=user_data, member=member, page=page, max_page=max_page, logs=logs)
+    view = WorkoutLogPageView(user_data=user_data, member=member, page=page, max_page=max_page, chunk=chunk)
     return e, view
 
 
@@ -996,19 +3348,15 @@ class WorkoutModal(discord.ui.Modal, title='Log Workout'):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-
             if self.editing_entry:
-                for w in user_data['workout_log']:
-                    if w['id'] == self.editing_entry['id']:
-                        w['workout']  = self.workout.value.strip()
-                        w['details']  = self.details.value.strip()
-                        w['category'] = self.category
-                        break
+                user_data = await storage.update_workout(interaction.user, self.editing_entry['id'], {
+                    'workout':  self.workout.value.strip(),
+                    'details':  self.details.value.strip(),
+                    'category': self.category,
+                })
                 msg = '✅ Entry updated!'
             else:
-                user_data['workout_log'].append({
+                user_data = await storage.append_workout(interaction.user, {
                     'id':        str(uuid.uuid4()),
                     'logged_at': utcnow(),
                     'category':  self.category,
@@ -1017,7 +3365,6 @@ class WorkoutModal(discord.ui.Modal, title='Log Workout'):
                 })
                 msg = '✅ Workout logged!'
 
-            await gh_save(data, sha, f'Workout log updated for {interaction.user.name}')
             embed, view = build_workout_log_page(user_data, interaction.user, page=0)
             await interaction.followup.send(msg, embed=embed, view=view, ephemeral=True)
         except Exception as ex:
@@ -1031,15 +3378,14 @@ class WorkoutLogPageView(discord.ui.View):
         member: discord.Member | discord.User,
         page: int,
         max_page: int,
-        logs: list[dict],
+        chunk: list[dict],
     ):
         super().__init__(timeout=300)
         self.user_data = user_data
         self.member    = member
         self.page      = page
         self.max_page  = max_page
-        self.logs      = logs
-        chunk = logs[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        self.chunk     = chunk   # the entries on this page, newest first
         if chunk:
             self.add_item(WorkoutActionSelect(chunk))
 
@@ -1061,13 +3407,12 @@ class WorkoutLogPageView(discord.ui.View):
 
     @discord.ui.button(label='📢 Publish to Channel', style=discord.ButtonStyle.secondary, row=2)
     async def publish(self, interaction: discord.Interaction, button: discord.ui.Button):
-        chunk = self.logs[self.page * PAGE_SIZE:(self.page + 1) * PAGE_SIZE]
-        pub   = discord.Embed(
+        pub = discord.Embed(
             title=f'🏋️ {self.member.display_name} — Recent Workouts',
             color=discord.Color.blue(),
             timestamp=datetime.now(timezone.utc),
         )
-        for w in chunk:
+        for w in self.chunk:
             pub.add_field(
                 name=f'[{w.get("category","?")}] {w["workout"]} — {w["logged_at"][:10]}',
                 value=(w.get('details') or '')[:256],
@@ -1095,10 +3440,11 @@ class WorkoutActionSelect(discord.ui.Select):
 
         if action == 'del':
             await interaction.response.defer(ephemeral=True)
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            user_data['workout_log'] = [w for w in user_data['workout_log'] if w['id'] != entry_id]
-            await gh_save(data, sha, f'Workout deleted for {interaction.user.name}')
+            try:
+                user_data = await storage.delete_workout(interaction.user, entry_id)
+            except Exception as ex:
+                await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+                return
             embed, view = build_workout_log_page(user_data, interaction.user, page=0)
             await interaction.followup.send('🗑️ Entry deleted.', embed=embed, view=view, ephemeral=True)
         else:
@@ -1126,15 +3472,611 @@ class PrivacyView(discord.ui.View):
     async def _set(self, interaction: discord.Interaction, value: bool):
         await interaction.response.defer(ephemeral=True)
         try:
-            data, sha = await gh_load()
-            user_data = ensure_user(data, interaction.user)
-            user_data['meta']['is_public'] = value
-            await gh_save(data, sha, f'Privacy updated for {interaction.user.name}')
+            await storage.set_privacy(interaction.user, value)
             label = 'Public 🌐' if value else 'Private 🔒'
             await interaction.followup.send(f'✅ Your profile is now **{label}**.', ephemeral=True)
         except Exception as ex:
             await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
 
+# ═══════════════════════════════════════════════════════════════════════════════
+#  TRENDS  (/fittrends)
+# ═══════════════════════════════════════════════════════════════════════════════
+def compute_trends(index: RecordIndex) -> dict:
+    """
+    Rolling average, week-over-week change and a least-squares trend for
+    every stat field at once (one row per field, missing values masked),
+    plus a projected completion date for each active goal. Cached on the
+    index per revision, so reopening is free until the data changes.
+    """
+    if index.trends is not None and index.trends[0] == index.revision:
+        return index.trends[1]
+    series = index.series
+    fields = list(GOAL_FIELDS)
+    result = {'fields': {}, 'goals': []}
+    if len(series):
+        T = np.frombuffer(series.times, dtype=np.float64)
+        V = np.vstack([np.frombuffer(series.columns[f], dtype=np.float64) for f in fields])
+        M = np.vstack([np.frombuffer(series.present[f], dtype=np.uint8) for f in fields]).astype(bool)
+        N = len(T)
+
+        # Rolling average of each row's last TREND_ROLLING_N recorded values
+        from_end = np.cumsum(M[:, ::-1], axis=1)[:, ::-1]
+        recent   = M & (from_end <= TREND_ROLLING_N)
+        counts   = recent.sum(axis=1)
+        rolling  = np.where(counts > 0, (V * recent).sum(axis=1) / np.maximum(counts, 1), np.nan)
+
+        # Week over week: newest value vs the newest one from an earlier week
+        week     = np.floor((T - 3 * 86400) / (7 * 86400))   # Sunday-based, like week_start_for
+        has_any  = M.any(axis=1)
+        last_i   = N - 1 - np.argmax(M[:, ::-1], axis=1)
+        earlier  = M & (week[None, :] < week[last_i][:, None])
+        prev_i   = N - 1 - np.argmax(earlier[:, ::-1], axis=1)
+        rows     = np.arange(len(fields))
+        wow      = np.where(earlier.any(axis=1), V[rows, last_i] - V[rows, prev_i], np.nan)
+
+        # Least squares v = a + b·days over the fit window (days relative to the newest entry)
+        days  = (T - T[-1]) / 86400
+        W     = (M & (days >= -TREND_FIT_DAYS)[None, :]).astype(np.float64)
+        n     = W.sum(axis=1)
+        st    = (W * days).sum(axis=1)
+        sv    = (W * V).sum(axis=1)
+        stt   = (W * days * days).sum(axis=1)
+        stv   = (W * days * V).sum(axis=1)
+        denom = n * stt - st * st
+        ok    = (n >= TREND_MIN_POINTS) & (denom > 1e-9)
+        slope = np.where(ok, (n * stv - st * sv) / np.where(ok, denom, 1), np.nan)
+        icept = np.where(ok, (sv - slope * st) / np.maximum(n, 1), np.nan)
+
+        for r, f in enumerate(fields):
+            if has_any[r]:
+                result['fields'][f] = {
+                    'latest':   float(V[r, last_i[r]]),
+                    'rolling':  float(rolling[r]),
+                    'wow':      None if np.isnan(wow[r]) else float(wow[r]),
+                    'per_week': None if np.isnan(slope[r]) else float(slope[r] * 7),
+                }
+
+        newest = datetime.fromtimestamp(T[-1], timezone.utc)
+        for spec in index.goals:
+            if spec.goal.get('completed_at') or spec.target is None:
+                continue
+            r = fields.index(spec.field)
+            result['goals'].append(_project_goal(spec, slope[r], icept[r], newest))
+    index.trends = (index.revision, result)
+    return result
+
+
+def _project_goal(spec: GoalSpec, slope: float, icept: float, newest: datetime) -> dict:
+    """Where the fitted line meets the goal's target, against its target_date."""
+    out = {'goal': spec.goal, 'projected': None, 'slack_days': None}
+    toward = slope < 0 if spec.direction == 'decrease' else slope > 0
+    if np.isnan(slope) or not toward:
+        return out
+    projected = newest + timedelta(days=max(0.0, (spec.target - icept) / slope))
+    out['projected'] = projected.strftime('%Y-%m-%d')
+    try:
+        due = datetime.strptime(spec.goal.get('target_date') or '', '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        out['slack_days'] = (due - projected).days
+    except ValueError:
+        pass
+    return out
+
+
+def fmt_trend(field: str, value: float, user_data: dict, signed: bool = False) -> str:
+    sign = '+' if signed and value > 0 else ''
+    if field == 'cardio_duration':
+        return f'{sign}{value:.0f} min'
+    ul = unit_label(user_data, field)
+    return f'{sign}{value:.1f} {ul}'.strip()
+
+
+def build_trends_embed(user_data: dict, member: discord.Member | discord.User, trends: dict) -> discord.Embed:
+    e = discord.Embed(title=f'📈 {member.display_name} — Trends', color=discord.Color.purple())
+    if not trends['fields']:
+        e.description = 'No stats recorded yet. Log some with `/currentfitstats`.'
+        return e
+    for f, t in trends['fields'].items():
+        lines = [f'**Latest:** {fmt_trend(f, t["latest"], user_data)}',
+                 f'**Avg (last {TREND_ROLLING_N}):** {fmt_trend(f, t["rolling"], user_data)}']
+        if t['wow'] is not None:
+            lines.append(f'**vs last week:** {fmt_trend(f, t["wow"], user_data, signed=True)}')
+        if t['per_week'] is not None:
+            lines.append(f'**Trend:** {fmt_trend(f, t["per_week"], user_data, signed=True)}/wk')
+        e.add_field(name=GOAL_FIELDS[f]['label'], value='\n'.join(lines), inline=True)
+    for p in trends['goals']:
+        g  = p['goal']
+        fl = GOAL_FIELDS.get(g['field'], {}).get('label', g['field'])
+        if p['projected'] is None:
+            value = 'Not trending toward the target yet.'
+        else:
+            value = f'Projected **{p["projected"]}**'
+            if p['slack_days'] is not None:
+                value += (f' — {p["slack_days"]} days ahead of {g["target_date"]} ✅' if p['slack_days'] >= 0
+                          else f' — {-p["slack_days"]} days behind {g["target_date"]} ⚠️')
+        e.add_field(name=f'🎯 {fl} → {fmt_stat(g["field"], g["target_value"], user_data)}', value=value, inline=False)
+    e.set_footer(text=f'Trend = least-squares fit over the last {TREND_FIT_DAYS} days')
+    return e
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  LEADERBOARD  (/fitleaderboard)
+# ═══════════════════════════════════════════════════════════════════════════════
+LEADERBOARD_METRICS = {
+    'progress': 'Goal Progress',
+    'workouts': 'Workouts per Week',
+    'streak':   'Workout Streak',
+    **{f: f'{v["label"]} Improvement' for f, v in GOAL_FIELDS.items()},
+}
+RANK_ICONS = ['🥇', '🥈', '🥉']
+
+
+def fmt_board_value(metric: str, value: float) -> str:
+    if metric == 'progress':
+        return f'{value:.0f}%'
+    if metric == 'workouts':
+        return f'{value:.1f} / week'
+    if metric == 'streak':
+        return f'{value:.0f} week{"s" if value != 1 else ""}'
+    return f'{value:+.1f}%'
+
+
+def build_leaderboard_embed(guild: discord.Guild, metric: str) -> discord.Embed:
+    ranked = leaderboard.top(metric, lambda uid: guild.get_member(int(uid)) is not None)
+    e = discord.Embed(title=f'🏆 {guild.name} — {LEADERBOARD_METRICS[metric]}', color=discord.Color.gold())
+    if not ranked:
+        e.description = 'No public members have data for this yet.'
+        return e
+    lines = []
+    for i, (value, uid, row) in enumerate(ranked):
+        member = guild.get_member(int(uid))
+        icon   = RANK_ICONS[i] if i < len(RANK_ICONS) else f'`#{i + 1}`'
+        lines.append(f'{icon} **{member.display_name if member else row["username"]}** — {fmt_board_value(metric, value)}')
+    e.description = '\n'.join(lines)
+    e.set_footer(text=f'Public profiles only · workouts/week over the last {LEADERBOARD_WEEKS} weeks')
+    return e
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  IMPORT / EXPORT  (/fitexport, /fitimport)
+# ═══════════════════════════════════════════════════════════════════════════════
+# One row per stat / workout / goal / note, told apart by 'kind'. JSONL rows
+# carry the record's own dicts; CSV rows carry these columns.
+EXPORT_COLUMNS = {
+    'stat':    ['recorded_at', *GOAL_FIELDS, 'notes'],
+    'workout': ['id', 'logged_at', 'category', 'workout', 'details'],
+    'goal':    ['id', 'field', 'direction', 'target_value', 'target_date', 'milestone_pct', 'created_at', 'completed_at'],
+    'note':    ['week_start', 'note'],
+}
+CSV_COLUMNS = ['kind', *dict.fromkeys(c for cols in EXPORT_COLUMNS.values() for c in cols)]
+
+
+def export_rows(user_data: dict, archives: list[dict] = ()):
+    """Every stat, workout, goal and note in user_data and its archive segments, one dict at a time."""
+    for part in (*archives, user_data):
+        for s in part.get('stats', []):
+            yield {'kind': 'stat', **s}
+    for part in (*archives, user_data):
+        for w in part.get('workout_log', []):
+            yield {'kind': 'workout', **w}
+    for g in user_data.get('goals', []):
+        yield {'kind': 'goal', **g}
+    for n in user_data.get('history_notes', []):
+        yield {'kind': 'note', **n}
+
+
+def write_export(user_data: dict, fmt: str, archives: list[dict] = ()):
+    """Stream export_rows into a temp file as fmt ('csv' / 'jsonl') → the binary file, rewound."""
+    raw  = tempfile.TemporaryFile()
+    text = TextIOWrapper(raw, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        writer = csv.DictWriter(text, CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(export_rows(user_data, archives))
+    else:
+        for row in export_rows(user_data, archives):
+            text.write(json.dumps(row, separators=(',', ':')) + '\n')
+    text.flush()
+    text.detach()
+    raw.seek(0)
+    return raw
+
+
+def read_import_rows(raw, fmt: str):
+    """(line number, row dict) for each row of the file; unparseable JSON lines come through as strings."""
+    text = TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ('', None)}
+        return
+    for n, line in enumerate(text, 1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = 'not valid JSON'
+            yield n, row if isinstance(row, (dict, str)) else 'not a JSON object'
+
+
+def _import_time(raw) -> str:
+    dt = datetime.fromisoformat(str(raw).strip())
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).astimezone(timezone.utc).isoformat()
+
+
+def _import_stat(row: dict) -> dict:
+    entry = {'recorded_at': _import_time(row['recorded_at'])}
+    for f in GOAL_FIELDS:
+        raw = row.get(f)
+        if raw is None or str(raw).strip() == '':
+            entry[f] = None
+        elif f == 'cardio_duration':
+            raw = str(raw).strip()
+            if cardio_to_min(raw) == 0 and raw.replace('0', '').strip(':') != '':
+                raise ValueError(f'{f} must be HH:MM, got {raw!r}')
+            entry[f] = raw
+        else:
+            entry[f] = parse_num(str(raw))
+            if entry[f] is None:
+                raise ValueError(f'{f} is not a number: {raw!r}')
+    entry['notes'] = row.get('notes') or None
+    if all(entry[f] is None for f in GOAL_FIELDS):
+        raise ValueError('no stat values')
+    return entry
+
+
+def _import_change(row: dict) -> dict:
+    kind = row.get('kind')
+    if kind == 'stat':
+        return {'type': 'stats_imported', 'entries': [_import_stat(row)]}
+    if kind == 'workout':
+        if not str(row.get('workout') or '').strip():
+            raise ValueError('workout name is missing')
+        return {'type': 'workout_appended', 'entry': {
+            'id':        str(row.get('id') or uuid.uuid4()),
+            'logged_at': _import_time(row['logged_at']),
+            'category':  row.get('category') or 'Other',
+            'workout':   str(row['workout']).strip()[:100],
+            'details':   str(row.get('details') or '').strip()[:1000],
+        }}
+    if kind == 'goal':
+        field = row.get('field')
+        if field not in GOAL_FIELDS:
+            raise ValueError(f'unknown goal field {field!r}')
+        target = str(row.get('target_value') or '').strip()
+        if (cardio_to_min(target) if field == 'cardio_duration' else parse_num(target)) in (None, 0):
+            raise ValueError(f'bad target_value {target!r}')
+        if row.get('target_date'):
+            datetime.strptime(str(row['target_date']), '%Y-%m-%d')
+        mp      = parse_milestone_pct(row.get('milestone_pct'))
+        reached = 0.0
+        if row.get('milestone_step'):
+            reached = float(row.get('milestone_k') or 0) * float(row['milestone_step'])
+        elif row.get('milestones_announced'):
+            reached = max(float(p) for p in row['milestones_announced'])
+        return {'type': 'goal_upserted', 'goal': {
+            'id':                   str(row.get('id') or uuid.uuid4()),
+            'label':                GOAL_FIELDS[field]['label'],
+            'field':                field,
+            'direction':            GOAL_FIELDS[field]['direction'],
+            'target_value':         target,
+            'target_date':          str(row.get('target_date') or ''),
+            'milestone_pct':        mp,
+            'created_at':           row.get('created_at') or utcnow(),
+            'completed_at':         row.get('completed_at') or None,
+            'milestone_k':          math.floor(reached / mp + 1e-9) if mp else 0,
+            'milestone_step':       mp,
+        }}
+    if kind == 'note':
+        ws = week_start_for(datetime.strptime(str(row['week_start'])[:10], '%Y-%m-%d'))
+        return {'type': 'note_upserted', 'week_start': ws, 'note': str(row.get('note') or '')[:1000]}
+    raise ValueError(f'unknown kind {kind!r} (expected stat, workout, goal or note)')
+
+
+def validate_import_rows(rows):
+    """(line, row) → (line, change) for good rows and (line, error message) for bad ones."""
+    for line, row in rows:
+        if isinstance(row, str):
+            yield line, row
+            continue
+        try:
+            yield line, _import_change(row)
+        except KeyError as ex:
+            yield line, f'missing {ex.args[0]}'
+        except (ValueError, TypeError) as ex:
+            yield line, str(ex)
+
+
+def import_changes(raw, fmt: str) -> tuple[list[dict], list[str], dict[str, int]]:
+    """
+    Parse an import file (binary, rewound) → (changes, errors, counts by kind).
+    Stat rows are batched into a single stats_imported change; the rest are
+    one change each, and the whole lot is written by a single import_records.
+    """
+    entries: list[dict] = []
+    changes: list[dict] = []
+    errors:  list[str]  = []
+    counts = dict.fromkeys(EXPORT_COLUMNS, 0)
+    for n, (line, result) in enumerate(validate_import_rows(read_import_rows(raw, fmt))):
+        if n >= IMPORT_MAX_ROWS:
+            errors.append(f'stopped after {IMPORT_MAX_ROWS} rows')
+            break
+        if isinstance(result, str):
+            errors.append(f'line {line}: {result}')
+        elif result['type'] == 'stats_imported':
+            entries += result['entries']
+            counts['stat'] += 1
+        else:
+            changes.append(result)
+            counts[{'workout_appended': 'workout', 'goal_upserted': 'goal', 'note_upserted': 'note'}[result['type']]] += 1
+    if entries:
+        changes.insert(0, {'type': 'stats_imported', 'entries': entries})
+    return changes, errors, counts
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  WEEKLY DIGEST
+# ═══════════════════════════════════════════════════════════════════════════════
+class PacedSender:
+    """
+    Channel sends queued and sent one at a time, at most one per
+    interval_s, so a burst (a big guild's digest) never turns into a 429
+    storm. send() returns a future for the sent message.
+    """
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._queue: asyncio.Queue | None = None
+        self._task:  asyncio.Task | None  = None
+
+    def send(self, channel: discord.abc.Messageable, **kwargs) -> asyncio.Future:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((channel, kwargs, done))
+        return done
+
+    async def _run(self):
+        while True:
+            channel, kwargs, done = await self._queue.get()
+            try:
+                done.set_result(await channel.send(**kwargs))
+            except discord.HTTPException as ex:
+                if ex.status == 429:   # discord.py retries these itself; back off harder before the next one
+                    await asyncio.sleep(self.interval_s * 4)
+                done.set_exception(ex)
+            except Exception as ex:
+                done.set_exception(ex)
+            await asyncio.sleep(self.interval_s)
+
+
+discord_sender = PacedSender(DISCORD_SEND_INTERVAL_S)
+
+
+def build_weekly_digests(users: dict[str, dict], ws: str) -> dict[str, dict]:
+    """
+    The week starting ws for every member in {uid: record} → {uid: digest},
+    leaving out members with nothing that week. Read off each record's
+    index: the week's stats are a bisected slice of its StatSeries and its
+    workouts are the ws week bucket. A digest is
+    {'stats': {field: (before, after)}, 'workouts': {category: n},
+     'completed': [goal], 'milestones': [(goal, step, from_k, to_k)]}.
+    """
+    ws_dt   = datetime.strptime(ws, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    we      = (ws_dt + timedelta(weeks=1)).strftime('%Y-%m-%d')
+    t_ws    = ws_dt.timestamp()
+    t_we    = t_ws + timedelta(weeks=1).total_seconds()
+    digests = {}
+    for uid, user_data in users.items():
+        index  = record_index(uid, user_data)
+        series = index.series
+        lo_i   = bisect.bisect_left(series.times, t_ws)
+        hi_i   = bisect.bisect_left(series.times, t_we)
+        before: dict[str, float] = {}
+        after:  dict[str, float] = {}
+        for f in GOAL_FIELDS:
+            i = series.present[f].rfind(1, lo_i, hi_i)
+            if i >= 0:
+                after[f] = series.columns[f][i]
+                j        = series.present[f].rfind(1, 0, lo_i)
+                if j >= 0:
+                    before[f] = series.columns[f][j]
+        stats = {f: (before.get(f), v) for f, v in after.items() if before.get(f) != v}
+
+        workouts: dict[str, int] = {}
+        for w in index.workouts.get(ws, []):
+            cat = w.get('category') or 'Other'
+            workouts[cat] = workouts.get(cat, 0) + 1
+
+        completed, milestones = [], []
+        baseline = index.baseline
+        for spec in index.goals:
+            g = spec.goal
+            if ws <= (g.get('completed_at') or '')[:10] < we:
+                completed.append(g)
+            elif spec.field in after and spec.step is not None and milestone_reached(g):
+                base   = getattr(baseline, spec.field)
+                lo     = goal_progress(spec, before.get(spec.field, base), base) or 0.0
+                hi     = goal_progress(spec, after[spec.field], base) or 0.0
+                from_k = math.floor(lo / spec.step + 1e-9)
+                to_k   = min(math.floor(hi / spec.step + 1e-9), milestone_done_k(g, spec.step))
+                if to_k > from_k:
+                    milestones.append((g, spec.step, from_k, to_k))
+
+        if stats or workouts or completed or milestones:
+            digests[uid] = {'stats': stats, 'workouts': workouts, 'completed': completed, 'milestones': milestones}
+    return digests
+
+
+def build_digest_embed(user_data: dict, name: str, ws: str, digest: dict) -> discord.Embed:
+    ws_dt = datetime.strptime(ws, '%Y-%m-%d')
+    label = f'{ws_dt.strftime("%b %d")} – {(ws_dt + timedelta(days=6)).strftime("%b %d, %Y")}'
+    e     = discord.Embed(title=f'🗓️ {name} — Week of {label}', color=discord.Color.teal())
+    if digest['stats']:
+        lines = []
+        for f, (old, new) in digest['stats'].items():
+            if old is None:
+                lines.append(f'{GOAL_FIELDS[f]["label"]}: {fmt_trend(f, new, user_data)}')
+            else:
+                lines.append(f'{GOAL_FIELDS[f]["label"]}: {fmt_trend(f, old, user_data)} → '
+                             f'{fmt_trend(f, new, user_data)} ({fmt_trend(f, new - old, user_data, signed=True)})')
+        e.add_field(name='📊 Stat Changes', value='\n'.join(lines), inline=False)
+    if digest['workouts']:
+        total = sum(digest['workouts'].values())
+        cats  = ', '.join(f'{c} ×{n}' for c, n in sorted(digest['workouts'].items()))
+        e.add_field(name='🏋️ Workouts', value=f'**{total}** logged — {cats}', inline=False)
+    goals = [f'🏆 Completed **{GOAL_FIELDS.get(g["field"], {}).get("label", g["field"])}** goal!'
+             for g in digest['completed']]
+    for g, step, from_k, to_k in digest['milestones']:
+        goals += milestone_lines(GOAL_FIELDS.get(g['field'], {}).get('label', g['field']), step, from_k, to_k)
+    if goals:
+        e.add_field(name='🎯 Goals', value='\n'.join(goals), inline=False)
+    return e
+
+
+async def send_weekly_digest(ws: str | None = None) -> int:
+    """Post the recap of week ws (default: the week just ended) to the digest channel → digests sent."""
+    channel = client.get_channel(DIGEST_CHANNEL_ID)
+    if channel is None:
+        print(f'⚠️  Digest channel {DIGEST_CHANNEL_ID} not found')
+        return 0
+    ws      = ws or week_start_for(datetime.now(timezone.utc) - timedelta(weeks=1))
+    users   = {uid: u for uid, u in (await storage.digest_records()).items()
+               if channel.guild.get_member(int(uid)) is not None}
+    digests = build_weekly_digests(users, ws)
+    embeds  = [build_digest_embed(users[uid], channel.guild.get_member(int(uid)).display_name, ws, d)
+               for uid, d in digests.items()]
+    batch: list[discord.Embed] = []
+    sends = []
+    for embed in embeds:
+        if batch and (len(batch) == DIGEST_EMBEDS_PER_MESSAGE or sum(map(len, batch)) + len(embed) > 6000):
+            sends.append(discord_sender.send(channel, embeds=batch))
+            batch = []
+        batch.append(embed)
+    if batch:
+        sends.append(discord_sender.send(channel, embeds=batch))
+    for result in await asyncio.gather(*sends, return_exceptions=True):
+        if isinstance(result, Exception):
+            print(f'⚠️  Weekly digest message failed: {result}')
+    return len(embeds)
+
+
+async def weekly_digest_loop():
+    """Sleep until the next Sunday at DIGEST_HOUR_UTC, send the digest, repeat."""
+    await client.wait_until_ready()
+    while True:
+        now  = datetime.now(timezone.utc)
+        due  = (now - timedelta(days=(now.weekday() + 1) % 7)).replace(hour=DIGEST_HOUR_UTC, minute=0,
+                                                                      second=0, microsecond=0)
+        if due <= now:
+            due += timedelta(weeks=1)
+        await asyncio.sleep((due - now).total_seconds())
+        try:
+            sent = await send_weekly_digest()
+            print(f'🗓️  Weekly digest sent for {sent} member(s)')
+        except Exception as ex:
+            print(f'⚠️  Weekly digest failed: {ex}')
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  GOAL REMINDERS
+# ═══════════════════════════════════════════════════════════════════════════════
+def goal_deadline(goal: dict) -> datetime | None:
+    """The goal's target_date as a UTC datetime, or None if it has none (or it isn't a YYYY-MM-DD date)."""
+    try:
+        return datetime.strptime(str(goal.get('target_date') or ''), '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class GoalReminders:
+    """
+    Every pending reminder (REMINDER_OFFSETS_DAYS before each incomplete
+    goal's target_date) in one min-heap by due time. run() sleeps until the
+    earliest is due, or until sync() pushes an earlier one. sync() re-plans
+    only the goals of one member whose deadline or sent reminders changed;
+    superseded heap entries are skipped when they surface rather than
+    searched for.
+    """
+    def __init__(self):
+        self._heap: list[tuple[float, int, str, str, int]] = []   # (due, version, uid, goal_id, days)
+        self._plans: dict[str, dict[str, tuple]] = {}              # uid → goal_id → (plan key, version)
+        self._version = itertools.count()
+        self._wake    = asyncio.Event()
+
+    def __len__(self) -> int:
+        return sum(len(goals) for goals in self._plans.values())
+
+    def sync(self, uid: str, goals: list[dict]):
+        now   = time.time()
+        plans = self._plans.setdefault(uid, {})
+        seen  = set()
+        for g in goals:
+            deadline = goal_deadline(g)
+            if deadline is None or g.get('completed_at'):
+                continue
+            seen.add(g['id'])
+            key = (g['target_date'], tuple(sorted(g.get('reminders_sent') or ())))
+            if g['id'] in plans and plans[g['id']][0] == key:
+                continue
+            version = next(self._version)
+            plans[g['id']] = (key, version)
+            for days in REMINDER_OFFSETS_DAYS:
+                due = (deadline - timedelta(days=days)).replace(hour=REMINDER_HOUR_UTC).timestamp()
+                if days not in key[1] and due > now - REMINDER_GRACE_S:
+                    if not self._heap or due < self._heap[0][0]:
+                        self._wake.set()
+                    heapq.heappush(self._heap, (due, version, uid, g['id'], days))
+        for goal_id in set(plans) - seen:   # deleted, completed or undated
+            del plans[goal_id]
+        if not plans:
+            del self._plans[uid]
+
+    def _current(self, version: int, uid: str, goal_id: str) -> bool:
+        plan = self._plans.get(uid, {}).get(goal_id)
+        return plan is not None and plan[1] == version
+
+    async def run(self):
+        await client.wait_until_ready()
+        while True:
+            while self._heap and not self._current(*self._heap[0][1:4]):
+                heapq.heappop(self._heap)
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, version, uid, goal_id, days = heapq.heappop(self._heap)
+            try:
+                await self._remind(uid, goal_id, days)
+            except Exception as ex:
+                print(f'⚠️  Goal reminder for {uid} failed: {ex}')
+
+    async def _remind(self, uid: str, goal_id: str, days: int):
+        user      = client.get_user(int(uid)) or await client.fetch_user(int(uid))
+        user_data = await storage.load_user(uid)
+        goal      = next((g for g in (user_data or {}).get('goals', []) if g['id'] == goal_id), None)
+        if goal is None or goal.get('completed_at') or days in goal.get('reminders_sent', []):
+            return
+        fl    = GOAL_FIELDS.get(goal['field'], {}).get('label', goal['field'])
+        index = record_index(uid, user_data)
+        spec  = next(sp for sp in index.goals if sp.goal is goal)
+        pct   = goal_progress(spec, index.series.last_recorded(spec.field), getattr(index.baseline, spec.field))
+        embed = discord.Embed(
+            title=f'⏳ {fl} goal due in {days} day{"s" if days != 1 else ""}',
+            description=(f'Target **{fmt_stat(goal["field"], goal["target_value"], user_data)}** '
+                         f'by **{goal["target_date"]}**.'
+                         + (f'\nYou\'re **{pct:.0f}%** of the way there.' if pct is not None else '')),
+            color=discord.Color.orange(),
+        )
+        try:
+            await discord_sender.send(user, embed=embed)
+        except discord.HTTPException as ex:   # DMs closed; don't retry
+            print(f'⚠️  Could not DM goal reminder to {user}: {ex}')
+        await storage.mark_goal_reminded(user, goal_id, days)
+
+
+goal_reminders = GoalReminders()
+
 # ═══════════════════════════════════════════════════════════════════════════════
 #  FITNESS HUB  (/b4c0nfitness + panel button)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1233,11 +4175,11 @@ class FitnessHubSelect(discord.ui.Select):
             )
 
         elif choice == 'history':
-            ws    = week_start_for()
-            ud    = user_data or {'meta': {}, 'stats': [], 'workout_log': [], 'history_notes': []}
-            embed = build_history_embed(ud, member, ws)
-            view  = HistoryView(ud, member, ws)
-            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            ud     = user_data or {'meta': {}, 'stats': [], 'workout_log': [], 'history_notes': []}
+            fields = await HistoryView(ud, member, week_start_for()).render()
+            await interaction.followup.send(embed=fields['embed'], view=fields['view'],
+                                            files=fields['attachments'], ephemeral=True)
 
         elif choice == 'workout':
             ud   = user_data or {'workout_log': []}
@@ -1249,110 +4191,437 @@ class FitnessHubSelect(discord.ui.Select):
             )
 
 # ═══════════════════════════════════════════════════════════════════════════════
-#  QUOTE IMAGE GENERATION  (unchanged)
+#  FITNESS COMMAND PIPELINE
 # ═══════════════════════════════════════════════════════════════════════════════
-async def generate_quote_image(user: discord.Member, quote_text: str) -> bytes:
+command_latency: dict[str, deque] = {}   # command → recent (ack_s, shown_s)
+
+
+def record_latency(name: str, ack_s: float, shown_s: float):
+    command_latency.setdefault(name, deque(maxlen=COMMAND_LATENCY_KEEP)).append((ack_s, shown_s))
+    if ack_s > COMMAND_ACK_BUDGET_S * 0.8:
+        print(f'⚠️  {name} took {ack_s:.2f}s to acknowledge (budget {COMMAND_ACK_BUDGET_S:.0f}s)')
+
+
+def latency_summary() -> dict[str, str]:
+    """command → 'ack p50/p99 · shown p50/p99' in ms, over the recent samples."""
+    def pct(values: list[float], p: float) -> float:
+        values = sorted(values)
+        return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+    out = {}
+    for name, samples in sorted(command_latency.items()):
+        acks, shown = [a for a, _ in samples], [s for _, s in samples]
+        out[name] = (f'ack {pct(acks, 0.5):.0f}/{pct(acks, 0.99):.0f} ms · '
+                     f'shown {pct(shown, 0.5):.0f}/{pct(shown, 0.99):.0f} ms (n={len(samples)})')
+    return out
+
+
+async def run_fitness_command(interaction: discord.Interaction, name: str, render):
+    """
+    Acknowledge first, fill in after. Defers straight away, shows
+    render(user_data) from the warm cache when there is one, then loads
+    fresh data and edits the response if anything changed. render returns
+    the message fields (content / embed / view / attachments), or a
+    coroutine that does.
+    """
+    started = time.perf_counter()
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    ack_s   = time.perf_counter() - started
+    uid     = str(interaction.user.id)
+    shown   = False
+    view    = None
+
+    async def show(user_data: dict | None) -> bool:
+        nonlocal shown, view
+        try:
+            fields = render(user_data)
+            if inspect.isawaitable(fields):
+                fields = await fields
+        except Exception as ex:
+            print(f'⚠️  {name} failed to render: {type(ex).__name__}: {ex}')
+            if shown:
+                await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+            else:
+                await interaction.edit_original_response(content=f'❌ Error: {ex}')
+            return False
+        fields = {'content': None, 'embed': None, 'view': None, 'attachments': [], **fields}
+        if view is not None:
+            view.stop()
+        view  = fields['view']
+        shown = True
+        await interaction.edit_original_response(**fields)
+        return True
+
+    cached  = storage.cached_user(uid)
+    version = storage.record_version(uid)
+    if cached is not None and not await show(cached):
+        record_latency(name, ack_s, time.perf_counter() - started)
+        return
+    shown_s = time.perf_counter() - started
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(user.display_avatar.url)) as resp:
-                avatar_bytes = await resp.read()
-            async with session.get(SPEECH_BUBBLE_IMAGE) as resp:
-                if resp.status != 200:
-                    raise Exception(f"Failed to download bubble: HTTP {resp.status}")
-                bubble_bytes = await resp.read()
-
-        avatar      = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-        bubble_orig = Image.open(BytesIO(bubble_bytes)).convert("RGBA")
-
-        avatar_size = 120
-        avatar = avatar.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
-        mask   = Image.new('L', (avatar_size, avatar_size), 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
-        avatar.putalpha(mask)
-
-        font          = ImageFont.load_default(size=24)
-        username_font = ImageFont.load_default(size=18)
-
-        max_chars = 200
-        if len(quote_text) > max_chars:
-            quote_text = quote_text[:max_chars - 3] + "..."
-
-        line_height   = 28
-        h_pad_left    = 0.15
-        h_pad_right   = 0.075
-        v_pad_px      = 100
-        draw_temp     = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
-
-        def wrap_text(text, max_width):
-            lines, current_line = [], ""
-            for word in text.split():
-                test_line = current_line + word + " "
-                if draw_temp.textbbox((0, 0), test_line, font=font)[2] <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line.strip())
-                    current_line = word + " "
-            if current_line:
-                lines.append(current_line.strip())
-            return lines
-
-        best_width, best_diff = 450, float('inf')
-        for tw in range(350, 750, 10):
-            tl = wrap_text(quote_text, int(tw * (1 - h_pad_left - h_pad_right)))
-            th = max(len(tl) * line_height + v_pad_px, 150)
-            d  = abs(tw / th - 3.0)
-            if d < best_diff:
-                best_diff, best_width = d, tw
-
-        target_bubble_width  = max(best_width, 300)
-        text_area_width      = int(target_bubble_width * (1 - h_pad_left - h_pad_right))
-        lines                = wrap_text(quote_text, text_area_width)
-        text_block_height    = len(lines) * line_height
-        target_bubble_height = max(text_block_height + v_pad_px, 120)
-
-        bubble   = bubble_orig.resize((target_bubble_width, target_bubble_height), Image.Resampling.LANCZOS)
-        padding  = 20
-        bubble_x = avatar_size + padding
-        bubble_y = padding
-        avatar_x = padding
-        avatar_y = bubble_y + target_bubble_height - avatar_size + 10
-
-        canvas = Image.new('RGBA', (
-            bubble_x + target_bubble_width + padding,
-            max(avatar_y + avatar_size + 40, bubble_y + target_bubble_height + padding),
-        ), (0, 0, 0, 0))
-        canvas.paste(bubble, (bubble_x, bubble_y), bubble)
-        canvas.paste(avatar, (avatar_x, avatar_y), avatar)
-
-        draw             = ImageDraw.Draw(canvas)
-        text_area_x      = bubble_x + int(target_bubble_width * h_pad_left)
-        text_offset_y    = bubble_y + (target_bubble_height - text_block_height) // 3
-
-        for i, line in enumerate(lines):
-            lw    = draw.textbbox((0, 0), line, font=font)[2]
-            tx    = text_area_x + (text_area_width - lw) // 2
-            draw.text((tx, text_offset_y + i * line_height), line, font=font, fill=(255, 255, 255, 255))
-
-        name_w = draw.textbbox((0, 0), user.display_name, font=username_font)[2]
-        draw.text(
-            (avatar_x + (avatar_size - name_w) // 2, avatar_y + avatar_size + 5),
-            user.display_name, font=username_font, fill=(255, 255, 255, 255),
-        )
+        user_data = await storage.load_user(uid) or None
+    except Exception as ex:
+        # A cached record on screen stays; without one, say what went wrong
+        # rather than render "no data" as if the member had none.
+        if not shown:
+            await interaction.edit_original_response(
+                content=f'⏳ {ex}' if isinstance(ex, GitHubRateLimited)
+                else f"❌ Couldn't load your fitness data right now: {ex}")
+        record_latency(name, ack_s, time.perf_counter() - started)
+        return
+    if not shown or user_data is not cached or storage.record_version(uid) != version:
+        if not shown:
+            shown_s = time.perf_counter() - started
+        await show(user_data)
+    record_latency(name, ack_s, shown_s)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Quote Rendering Pool
+# ═══════════════════════════════════════════════════════════════════════════════
+class QuoteRendererBusy(Exception):
+    """Too many quotes are already rendering; the message is safe to show the member."""
+
+
+class QuoteRenderer:
+    """
+    Pillow work for quotes (decodes, LANCZOS resizes, compositing, PNG
+    encode) runs on a small thread pool, so the event loop and the gateway
+    heartbeat never wait on it. The pool's size caps how many jobs run at
+    once; admit() caps how many quotes may be in progress in all, and turns
+    away the rest with QuoteRendererBusy rather than letting them pile up.
+    """
+    def __init__(self, workers: int, max_queued: int):
+        self.pool       = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quote')
+        self.max_queued = max_queued
+        self.queued     = 0
+        self.rejected   = 0
+        self.timings: dict[str, deque] = {}   # job name → (wait_s, run_s) samples
+
+    @contextlib.contextmanager
+    def admit(self):
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise QuoteRendererBusy("Lots of quotes are being made right now — please try again in a moment.")
+        self.queued += 1
+        try:
+            yield
+        finally:
+            self.queued -= 1
+
+    async def run(self, fn, *args):
+        """fn(*args) on the pool, timing how long it waited and how long it ran."""
+        submitted = time.perf_counter()
+
+        def timed():
+            begun = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.timings.setdefault(fn.__name__, deque(maxlen=COMMAND_LATENCY_KEEP)).append(
+                    (begun - submitted, time.perf_counter() - begun))
+
+        return await asyncio.get_running_loop().run_in_executor(self.pool, timed)
+
+    def status(self) -> str:
+        """Queue depth, refusals, and p50/p99 wait + run per job, in ms."""
+        def pct(values: list[float], p: float) -> float:
+            values = sorted(values)
+            return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+        lines = [f'{self.queued} / {self.max_queued} in progress · {self.rejected} turned away']
+        for name, samples in sorted(self.timings.items()):
+            samples      = list(samples)
+            waits, runs  = [w for w, _ in samples], [r for _, r in samples]
+            lines.append(f'`{name}` wait {pct(waits, 0.5):.0f}/{pct(waits, 0.99):.0f} · '
+                         f'run {pct(runs, 0.5):.0f}/{pct(runs, 0.99):.0f} ms (n={len(samples)})')
+        return '\n'.join(lines)
+
+
+quote_renderer = QuoteRenderer(QUOTE_RENDER_THREADS, QUOTE_QUEUE_MAX)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Quote Assets
+# ═══════════════════════════════════════════════════════════════════════════════
+def _asset_size(value) -> int:
+    """Cost of a quote_assets entry: raw bytes, or the decoded pixel buffer."""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    return len(value)
+
+
+# Two levels in one budget: ('raw', url) → downloaded bytes, and
+# ('avatar', url, size) / ('bubble', w, h) → decoded RGBA images.
+# Avatar URLs carry the avatar hash, so a changed avatar is a new key.
+quote_assets = ByteLRU(QUOTE_ASSET_CACHE_BYTES, size=_asset_size)
+quote_bubble: Image.Image | None = None    # decoded once; pinned, never evicted
+_asset_fetches: dict[str, asyncio.Future] = {}
+
+
+def load_quote_bubble() -> bool:
+    """Decode the bundled speech bubble from SPEECH_BUBBLE_PATH, if present."""
+    global quote_bubble
+    if quote_bubble is not None:
+        return True
+    try:
+        with Image.open(SPEECH_BUBBLE_PATH) as im:
+            quote_bubble = im.convert('RGBA')
+    except OSError as ex:
+        print(f'⚠️  Speech bubble not loaded from {SPEECH_BUBBLE_PATH}: {ex}')
+        return False
+    return True
+
+
+def decode_rgba(data: bytes) -> Image.Image:
+    return Image.open(BytesIO(data)).convert('RGBA')
+
+
+def resize_image(im: Image.Image, width: int, height: int) -> Image.Image:
+    return im.resize((width, height), Image.Resampling.LANCZOS)
+
 
-        output = BytesIO()
-        canvas.save(output, format='PNG')
-        output.seek(0)
-        return output.getvalue()
+def circle_avatar(data: bytes, size: int) -> Image.Image:
+    """Decode avatar bytes to a size × size RGBA image masked to a circle."""
+    avatar = resize_image(decode_rgba(data), size, size)
+    mask   = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    avatar.putalpha(mask)
+    return avatar
 
-    except Exception as e:
-        import traceback
-        print(f"Error in generate_quote_image: {type(e).__name__}: {e}")
-        traceback.print_exc()
+
+async def fetch_asset(url: str) -> bytes:
+    """
+    GET url through the shared session, cached by URL. Concurrent callers for
+    the same URL share one download.
+    """
+    data = quote_assets.get(('raw', url))
+    if data is not None:
+        return data
+    pending = _asset_fetches.get(url)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    fut = asyncio.get_running_loop().create_future()
+    _asset_fetches[url] = fut
+    try:
+        async with http_session().get(url) as resp:
+            if resp.status != 200:
+                raise Exception(f"Failed to download {url}: HTTP {resp.status}")
+            data = await resp.read()
+        quote_assets.put(('raw', url), data)
+        fut.set_result(data)
+        return data
+    except Exception as ex:
+        fut.set_exception(ex)
+        fut.exception()   # retrieved here so a lone caller doesn't log "never retrieved"
+        raise
+    except BaseException:
+        fut.cancel()
         raise
+    finally:
+        del _asset_fetches[url]
+
+
+async def speech_bubble() -> Image.Image:
+    """The decoded bubble: the bundled file, else SPEECH_BUBBLE_IMAGE fetched once."""
+    global quote_bubble
+    if quote_bubble is None and not load_quote_bubble():
+        if not SPEECH_BUBBLE_IMAGE:
+            raise Exception("No speech bubble: set SPEECH_BUBBLE_PATH or SPEECH_BUBBLE_IMAGE")
+        data = await fetch_asset(SPEECH_BUBBLE_IMAGE)
+        quote_bubble = await quote_renderer.run(decode_rgba, data)
+    return quote_bubble
+
+
+async def sized_bubble(width: int, height: int) -> Image.Image:
+    """The bubble resized to width × height; layouts repeat, so sizes are cached."""
+    key    = ('bubble', width, height)
+    bubble = quote_assets.get(key)
+    if bubble is None:
+        bubble = await quote_renderer.run(resize_image, await speech_bubble(), width, height)
+        quote_assets.put(key, bubble)
+    return bubble
+
+
+async def masked_avatar(user: discord.abc.User, size: int = QUOTE_AVATAR_SIZE) -> Image.Image:
+    """user's avatar as a size × size RGBA circle. Callers must not draw on it."""
+    url    = str(user.display_avatar.with_size(QUOTE_AVATAR_FETCH_SIZE).url)
+    key    = ('avatar', url, size)
+    avatar = quote_assets.get(key)
+    if avatar is None:
+        avatar = await quote_renderer.run(circle_avatar, await fetch_asset(url), size)
+        quote_assets.put(key, avatar)
+    return avatar
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  Quote Layout
+# ═══════════════════════════════════════════════════════════════════════════════
+QUOTE_WIDTHS      = range(350, 750, 10)   # candidate bubble widths, narrowest first
+QUOTE_FONT_SIZE   = 24
+QUOTE_NAME_SIZE   = 18
+QUOTE_MAX_CHARS   = 200
+QUOTE_LINE_HEIGHT = 28
+QUOTE_PAD_LEFT    = 0.15    # of the bubble width
+QUOTE_PAD_RIGHT   = 0.075
+QUOTE_V_PAD       = 100     # px above and below the text, together
+QUOTE_TEXT_FRAC   = 1 - QUOTE_PAD_LEFT - QUOTE_PAD_RIGHT
+
+_fonts: dict[tuple[int, int], ImageFont.FreeTypeFont] = {}   # (thread, size); FreeType faces aren't thread-safe
+_advances: dict[int, dict[str, float]] = {}   # font size → char → advance px
+
+
+def quote_font(size: int) -> ImageFont.FreeTypeFont:
+    """The bundled default font at size, loaded once per thread."""
+    key  = (threading.get_ident(), size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = ImageFont.load_default(size=size)
+    return font
+
+
+def text_width(text: str, size: int) -> float:
+    """
+    Width of text in quote_font(size), summed from a per-character advance
+    table that fills in as new characters turn up. The default font has no
+    kerning, so this matches textbbox without shaping the whole string.
+    """
+    table = _advances.setdefault(size, {})
+    width = 0.0
+    for ch in text:
+        adv = table.get(ch)
+        if adv is None:
+            adv = table[ch] = quote_font(size).getlength(ch)
+        width += adv
+    return width
+
+
+class TextLayout:
+    """
+    Greedy word wrap for one string at any width. Each word is measured once;
+    ends[i] is the width of the first i words, each with its trailing space,
+    so the words that fit on a line starting at word i are found by bisection.
+    """
+    def __init__(self, text: str, size: int):
+        self.words = text.split()
+        self.size  = size
+        self.space = text_width(' ', size)
+        self.ends  = list(itertools.accumulate((text_width(w, size) + self.space for w in self.words), initial=0.0))
+
+    def _breaks(self, max_width: float) -> list[int]:
+        """Word index where each line starts, plus len(words) at the end."""
+        breaks, i, n = [0], 0, len(self.words)
+        while i < n:
+            j = bisect.bisect_right(self.ends, self.ends[i] + max_width, i + 1) - 1
+            i = max(j, i + 1)   # a word wider than the line still gets a line to itself
+            breaks.append(i)
+        return breaks
+
+    def line_count(self, max_width: float) -> int:
+        return len(self._breaks(max_width)) - 1
+
+    def lines(self, max_width: float) -> list[tuple[str, float]]:
+        """(line, width) pairs, the width without the trailing space."""
+        b = self._breaks(max_width)
+        return [(' '.join(self.words[i:j]), self.ends[j] - self.ends[i] - self.space) for i, j in zip(b, b[1:])]
+
+
+def best_bubble_width(layout: TextLayout, text_frac: float, line_height: int, v_pad: int,
+                      aspect: float = 3.0) -> int:
+    """
+    The QUOTE_WIDTHS entry whose bubble comes closest to aspect (width /
+    height). Wider bubbles never need more lines, so the ratio grows with the
+    width and the closest entry sits where it crosses aspect: a bisection
+    over the candidates finds it in a handful of wraps.
+    """
+    def ratio(tw: int) -> float:
+        return tw / max(layout.line_count(int(tw * text_frac)) * line_height + v_pad, 150)
+
+    lo, hi = 0, len(QUOTE_WIDTHS) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if ratio(QUOTE_WIDTHS[mid]) < aspect:
+            lo = mid + 1
+        else:
+            hi = mid
+    # lo is the first width at or past aspect; the one before may be closer (ties go narrower)
+    if lo > 0 and abs(ratio(QUOTE_WIDTHS[lo - 1]) - aspect) <= abs(ratio(QUOTE_WIDTHS[lo]) - aspect):
+        lo -= 1
+    return QUOTE_WIDTHS[lo]
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  QUOTE IMAGE GENERATION
+# ═══════════════════════════════════════════════════════════════════════════════
+def render_quote(avatar: Image.Image, bubble: Image.Image, lines: list[tuple[str, float]],
+                 display_name: str) -> bytes:
+    """
+    Composite the sized bubble, the masked avatar, the wrapped lines and the
+    name into a PNG. Pure Pillow, run on quote_renderer's pool.
+    """
+    avatar_size          = avatar.width
+    target_bubble_width  = bubble.width
+    target_bubble_height = bubble.height
+    text_area_width      = int(target_bubble_width * QUOTE_TEXT_FRAC)
+    text_block_height    = len(lines) * QUOTE_LINE_HEIGHT
+    font                 = quote_font(QUOTE_FONT_SIZE)
+    username_font        = quote_font(QUOTE_NAME_SIZE)
+
+    padding  = 20
+    bubble_x = avatar_size + padding
+    bubble_y = padding
+    avatar_x = padding
+    avatar_y = bubble_y + target_bubble_height - avatar_size + 10
+
+    canvas = Image.new('RGBA', (
+        bubble_x + target_bubble_width + padding,
+        max(avatar_y + avatar_size + 40, bubble_y + target_bubble_height + padding),
+    ), (0, 0, 0, 0))
+    canvas.paste(bubble, (bubble_x, bubble_y), bubble)
+    canvas.paste(avatar, (avatar_x, avatar_y), avatar)
+
+    draw          = ImageDraw.Draw(canvas)
+    text_area_x   = bubble_x + int(target_bubble_width * QUOTE_PAD_LEFT)
+    text_offset_y = bubble_y + (target_bubble_height - text_block_height) // 3
+
+    for i, (line, lw) in enumerate(lines):
+        tx = text_area_x + int(text_area_width - lw) // 2
+        draw.text((tx, text_offset_y + i * QUOTE_LINE_HEIGHT), line, font=font, fill=(255, 255, 255, 255))
+
+    name_w = int(text_width(display_name, QUOTE_NAME_SIZE))
+    draw.text(
+        (avatar_x + (avatar_size - name_w) // 2, avatar_y + avatar_size + 5),
+        display_name, font=username_font, fill=(255, 255, 255, 255),
+    )
+
+    output = BytesIO()
+    canvas.save(output, format='PNG')
+    return output.getvalue()
+
+
+async def generate_quote_image(user: discord.Member, quote_text: str) -> bytes:
+    """
+    The quote card for user saying quote_text, as PNG bytes. Assets come
+    from quote_assets and layout is done here; everything that touches
+    pixels runs on quote_renderer. Raises QuoteRendererBusy when too many
+    quotes are already in progress.
+    """
+    with quote_renderer.admit():
+        try:
+            if len(quote_text) > QUOTE_MAX_CHARS:
+                quote_text = quote_text[:QUOTE_MAX_CHARS - 3] + "..."
+
+            avatar = await masked_avatar(user, QUOTE_AVATAR_SIZE)
+            layout = TextLayout(quote_text, QUOTE_FONT_SIZE)
+            width  = max(best_bubble_width(layout, QUOTE_TEXT_FRAC, QUOTE_LINE_HEIGHT, QUOTE_V_PAD), 300)
+            lines  = layout.lines(int(width * QUOTE_TEXT_FRAC))
+            bubble = await sized_bubble(width, max(len(lines) * QUOTE_LINE_HEIGHT + QUOTE_V_PAD, 120))
+            return await quote_renderer.run(render_quote, avatar, bubble, lines, user.display_name)
+
+        except Exception as e:
+            import traceback
+            print(f"Error in generate_quote_image: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            raise
 
 # ═══════════════════════════════════════════════════════════════════════════════
-#  QUOTE MODALS  (unchanged)
+#  QUOTE MODALS
 # ═══════════════════════════════════════════════════════════════════════════════
 class QuoteUserSelectView(discord.ui.View):
     def __init__(self):
@@ -1406,6 +4675,8 @@ class UserQuoteModal(discord.ui.Modal, title="Submit a Quote"):
                     await interaction.followup.send("❌ Quotes channel not found!", ephemeral=True)
             else:
                 await interaction.followup.send("❌ QUOTES_CHANNEL_ID not configured!", ephemeral=True)
+        except QuoteRendererBusy as e:
+            await interaction.followup.send(f"⏳ {e}", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Error creating quote: {e}", ephemeral=True)
 
@@ -1437,6 +4708,8 @@ class QuoteModal(discord.ui.Modal, title="Submit a Quote"):
                     await interaction.followup.send("❌ Quotes channel not found!", ephemeral=True)
             else:
                 await interaction.followup.send("❌ QUOTES_CHANNEL_ID not configured!", ephemeral=True)
+        except QuoteRendererBusy as e:
+            await interaction.followup.send(f"⏳ {e}", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Error creating quote: {e}", ephemeral=True)
 
@@ -1447,6 +4720,11 @@ FITNESS_COMMANDS = [
     ('/currentfitstats',  'View your current stats or log an update. Automatically checks for goal completions and milestone hits.'),
     ('/fithistory',       'Browse your weekly progress with stat updates, workouts, and notes. Navigate back week by week.'),
     ('/fitworkoutlog',    'Log a new workout or browse and manage past entries.'),
+    ('/fittrends',        'Rolling averages, week-over-week changes, and projected goal dates from your stat history.'),
+    ('/fitleaderboard',   'Rank public members by goal progress, workouts, streaks, or improvement.'),
+    ('/fitdigest',        'Opt in or out of the Sunday recap of your week, posted for public profiles.'),
+    ('/fitexport',        'Download all your fitness data as CSV or JSON Lines.'),
+    ('/fitimport',        'Bulk-load stats, workouts, goals, and notes from a CSV or JSON Lines file.'),
 ]
 
 
@@ -1508,25 +4786,17 @@ class PanelButton(discord.ui.Button):
             )
 
         elif self.custom_id == "btn_fitness":
-            try:
-                data, _   = await gh_load()
-                user_data = data['users'].get(str(interaction.user.id))
-                if not user_data:
-                    user_data = None
-            except Exception:
-                user_data = None
-
-            await interaction.response.send_message(
-                embed=build_fitness_hub_embed(),
-                view=FitnessHubView(user_data=user_data, member=interaction.user),
-                ephemeral=True,
-            )
+            await run_fitness_command(interaction, 'Fitness Tracker button', lambda user_data: {
+                'embed': build_fitness_hub_embed(),
+                'view':  FitnessHubView(user_data=user_data, member=interaction.user),
+            })
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  EVENTS
 # ═══════════════════════════════════════════════════════════════════════════════
 @client.event
 async def on_ready():
+    http_session()
     client.add_view(BotPanelView())
     await tree.sync()
     print(f'✅ Logged in as {client.user}')
@@ -1543,6 +4813,8 @@ async def on_ready():
         print(f'💪 Fitness role ID: {FITNESS_ROLE_ID}')
     else:
         print(f'ℹ️  FITNESS_ROLE_ID not set — publishes will not ping a role')
+    if DIGEST_CHANNEL_ID:
+        print(f'🗓️  Weekly digests go to channel ID: {DIGEST_CHANNEL_ID}')
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #  SLASH COMMANDS
@@ -1575,110 +4847,221 @@ async def initializeb4c0n_error(interaction: discord.Interaction, error: app_com
             "❌ You need the **Manage Server** permission to use this command.", ephemeral=True
         )
 
+
+@tree.command(name="b4c0nstatus", description="Show GitHub rate-limit budget and storage queues (admin only)")
+@app_commands.checks.has_permissions(manage_guild=True)
+async def b4c0nstatus(interaction: discord.Interaction):
+    gh     = github.status()
+    budget = f"{gh['remaining']} / {gh['limit']}" if gh['remaining'] is not None else 'unknown (no calls yet)'
+    if gh['reset_in_s'] is not None:
+        budget += f"\nresets in {gh['reset_in_s'] / 60:.0f} min"
+    embed = discord.Embed(title="🥓 b4c0n — Status", color=discord.Color.orange())
+    embed.add_field(name="GitHub budget", value=budget, inline=False)
+    embed.add_field(name="Paused", value=f"{gh['paused_for_s']:.0f}s" if gh['paused_for_s'] else 'no', inline=True)
+    embed.add_field(name="In flight", value=str(gh['inflight']), inline=True)
+    embed.add_field(
+        name="Queued",
+        value=' · '.join(f'{k}: {v}' for k, v in gh['queued'].items()),
+        inline=True,
+    )
+    for label, value in storage.status().items():
+        embed.add_field(name=label, value=str(value), inline=True)
+    embed.add_field(name="Chart cache", value=chart_cache.status(), inline=False)
+    embed.add_field(name="Quote asset cache", value=quote_assets.status(), inline=False)
+    embed.add_field(name="Quote renders", value=quote_renderer.status(), inline=False)
+    embed.add_field(name="Goals with reminders", value=str(len(goal_reminders)), inline=True)
+    latency = latency_summary()
+    if latency:
+        embed.add_field(
+            name="Command latency (p50/p99)",
+            value='\n'.join(f'`{name}` {line}' for name, line in latency.items()),
+            inline=False,
+        )
+    embed.set_footer(text=f"Fitness backend: {FITNESS_BACKEND}")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@b4c0nstatus.error
+async def b4c0nstatus_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.MissingPermissions):
+        await interaction.response.send_message(
+            "❌ You need the **Manage Server** permission to use this command.", ephemeral=True
+        )
+
 # ── Fitness ───────────────────────────────────────────────────────────────────
 @tree.command(name="b4c0nfitness", description="Open the fitness tracker hub")
 async def b4c0nfitness(interaction: discord.Interaction):
-    try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
-
-    await interaction.response.send_message(
-        embed=build_fitness_hub_embed(),
-        view=FitnessHubView(user_data=user_data, member=interaction.user),
-        ephemeral=True,
-    )
+    await run_fitness_command(interaction, '/b4c0nfitness', lambda user_data: {
+        'embed': build_fitness_hub_embed(),
+        'view':  FitnessHubView(user_data=user_data, member=interaction.user),
+    })
 
 
 @tree.command(name="setfitbaseline", description="Set your fitness baseline (required before goals & stats)")
 async def setfitbaseline(interaction: discord.Interaction):
-    try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
-
-    unit     = user_data['meta'].get('unit_preference', 'lbs') if user_data else 'lbs'
-    existing = user_data.get('baseline') if user_data else None
-    await interaction.response.send_message(
-        '📏 **Set your baseline stats.**\nFirst, choose your unit preference:',
-        view=BaselineUnitView(existing_unit=unit, existing=existing),
-        ephemeral=True,
-    )
+    def render(user_data):
+        unit     = user_data['meta'].get('unit_preference', 'lbs') if user_data else 'lbs'
+        existing = user_data.get('baseline') if user_data else None
+        return {
+            'content': '📏 **Set your baseline stats.**\nFirst, choose your unit preference:',
+            'view':    BaselineUnitView(existing_unit=unit, existing=existing),
+        }
+
+    await run_fitness_command(interaction, '/setfitbaseline', render)
 
 
 @tree.command(name="setfitgoals", description="View or manage your fitness goals")
 async def setfitgoals(interaction: discord.Interaction):
-    try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
-
-    if not user_data or not user_data.get('baseline'):
-        await interaction.response.send_message(
-            '⚠️ Set your baseline first with `/setfitbaseline`.', ephemeral=True
-        )
-        return
+    def render(user_data):
+        if not user_data or not user_data.get('baseline'):
+            return {'content': '⚠️ Set your baseline first with `/setfitbaseline`.'}
+        return {
+            'embed': build_goals_embed(user_data, interaction.user),
+            'view':  GoalsMainView(user_data, interaction.user),
+        }
 
-    embed = build_goals_embed(user_data, interaction.user)
-    view  = GoalsMainView(user_data, interaction.user)
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await run_fitness_command(interaction, '/setfitgoals', render)
 
 
 @tree.command(name="currentfitstats", description="View or update your current fitness stats")
 async def currentfitstats(interaction: discord.Interaction):
-    try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
-
-    if not user_data or not user_data.get('baseline'):
-        await interaction.response.send_message(
-            '⚠️ Set your baseline first with `/setfitbaseline`.', ephemeral=True
-        )
-        return
+    def render(user_data):
+        if not user_data or not user_data.get('baseline'):
+            return {'content': '⚠️ Set your baseline first with `/setfitbaseline`.'}
+        return {
+            'content': '📊 **Fitness Stats** — view your current numbers or log an update:',
+            'view':    StatsMainView(user_data, interaction.user),
+        }
 
-    view = StatsMainView(user_data, interaction.user)
-    await interaction.response.send_message(
-        '📊 **Fitness Stats** — view your current numbers or log an update:',
-        view=view,
-        ephemeral=True,
-    )
+    await run_fitness_command(interaction, '/currentfitstats', render)
 
 
 @tree.command(name="fithistory", description="Browse your weekly fitness history")
 async def fithistory(interaction: discord.Interaction):
-    try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
+    async def render(user_data):
+        ud = user_data or {'meta': {}, 'stats': [], 'workout_log': [], 'history_notes': []}
+        return await HistoryView(ud, interaction.user, week_start_for()).render()
 
-    ud    = user_data or {'meta': {}, 'stats': [], 'workout_log': [], 'history_notes': []}
-    ws    = week_start_for()
-    embed = build_history_embed(ud, interaction.user, ws)
-    view  = HistoryView(ud, interaction.user, ws)
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await run_fitness_command(interaction, '/fithistory', render)
 
 
 @tree.command(name="fitworkoutlog", description="Log a new workout or browse your workout history")
 async def fitworkoutlog(interaction: discord.Interaction):
+    def render(user_data):
+        return {
+            'content': '🏋️ **Workout Log** — log a new workout or browse past entries:',
+            'view':    WorkoutLogMainView(user_data or {'workout_log': []}, interaction.user),
+        }
+
+    await run_fitness_command(interaction, '/fitworkoutlog', render)
+
+
+@tree.command(name="fittrends", description="See your stat trends and projected goal dates")
+async def fittrends(interaction: discord.Interaction):
+    def render(user_data):
+        if not user_data or not user_data.get('baseline'):
+            return {'content': '⚠️ Set your baseline first with `/setfitbaseline`.'}
+        trends = compute_trends(record_index(str(interaction.user.id), user_data))
+        embed  = build_trends_embed(user_data, interaction.user, trends)
+        return {'embed': embed, 'view': PublishView(embed=embed, guild=interaction.guild)}
+
+    await run_fitness_command(interaction, '/fittrends', render)
+
+
+@tree.command(name="fitdigest", description="Turn your weekly Sunday recap on or off")
+@app_commands.describe(enabled="Post a recap of your week every Sunday")
+async def fitdigest(interaction: discord.Interaction, enabled: bool):
+    await interaction.response.defer(ephemeral=True)
     try:
-        data, _   = await gh_load()
-        user_data = data['users'].get(str(interaction.user.id))
-    except Exception:
-        user_data = None
-
-    ud   = user_data or {'workout_log': []}
-    view = WorkoutLogMainView(ud, interaction.user)
-    await interaction.response.send_message(
-        '🏋️ **Workout Log** — log a new workout or browse past entries:',
-        view=view,
-        ephemeral=True,
-    )
+        user_data = await storage.set_digest(interaction.user, enabled)
+        if not enabled:
+            msg = '✅ Weekly digest is **off**.'
+        elif not user_data['meta'].get('is_public', True):
+            msg = '✅ Weekly digest is **on** — it only posts while your profile is public (see the hub\'s Privacy option).'
+        else:
+            msg = '✅ Weekly digest is **on** — look for it every Sunday.'
+        await interaction.followup.send(msg, ephemeral=True)
+    except Exception as ex:
+        await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+
+
+@tree.command(name="fitexport", description="Download your fitness data")
+@app_commands.describe(format="File format (default: CSV)")
+@app_commands.choices(format=[app_commands.Choice(name='CSV', value='csv'),
+                              app_commands.Choice(name='JSON Lines', value='jsonl')])
+async def fitexport(interaction: discord.Interaction, format: app_commands.Choice[str] | None = None):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        user_data = await storage.load_user(str(interaction.user.id))
+        if not user_data:
+            await interaction.followup.send('⚠️ Nothing to export yet.', ephemeral=True)
+            return
+        fmt      = format.value if format else 'csv'
+        uid      = str(interaction.user.id)
+        archives = [a for y in (user_data.get('archive') or {}).get('years', [])
+                    if (a := await storage.load_archive(uid, y)) is not None]
+        n_stats    = len(user_data['stats']) + sum(len(a['stats']) for a in archives)
+        n_workouts = len(user_data['workout_log']) + sum(len(a['workout_log']) for a in archives)
+        with write_export(user_data, fmt, archives) as fh:
+            await interaction.followup.send(
+                f'📦 Your fitness data — {n_stats} stat update(s), '
+                f'{n_workouts} workout(s), {len(user_data["goals"])} goal(s).',
+                file=discord.File(fh, filename=f'b4c0n-fitness-{interaction.user.name}.{fmt}'),
+                ephemeral=True,
+            )
+    except Exception as ex:
+        await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+
+
+@tree.command(name="fitimport", description="Bulk-load fitness data from a CSV or JSON Lines file")
+@app_commands.describe(file="A /fitexport file, or your own with the same columns")
+async def fitimport(interaction: discord.Interaction, file: discord.Attachment):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        ext = file.filename.rsplit('.', 1)[-1].lower()
+        fmt = 'csv' if ext == 'csv' else 'jsonl' if ext in ('jsonl', 'ndjson', 'json') else None
+        if fmt is None:
+            await interaction.followup.send('⚠️ Attach a `.csv` or `.jsonl` file.', ephemeral=True)
+            return
+        if file.size > IMPORT_MAX_BYTES:
+            await interaction.followup.send(f'⚠️ That file is over {IMPORT_MAX_BYTES // (1024 * 1024)} MB.', ephemeral=True)
+            return
+        with tempfile.TemporaryFile() as raw:
+            async with http_session().get(file.url) as resp:
+                if resp.status != 200:
+                    raise Exception(f'Could not download the attachment: HTTP {resp.status}')
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    raw.write(chunk)
+            raw.seek(0)
+            changes, errors, counts = await asyncio.get_running_loop().run_in_executor(
+                None, import_changes, raw, fmt)
+        if not changes:
+            await interaction.followup.send(
+                '⚠️ Nothing to import.' + ('\n' + '\n'.join(errors[:IMPORT_ERRORS_SHOWN]) if errors else ''),
+                ephemeral=True,
+            )
+            return
+        await storage.import_records(interaction.user, changes)
+        summary = ', '.join(f'{n} {kind}{"s" if n != 1 else ""}' for kind, n in counts.items() if n)
+        lines   = [f'✅ Imported {summary}. Rows already present were skipped.']
+        if errors:
+            lines.append(f'⚠️ {len(errors)} row(s) skipped:')
+            lines += [f'• {e}' for e in errors[:IMPORT_ERRORS_SHOWN]]
+        await interaction.followup.send('\n'.join(lines), ephemeral=True)
+    except Exception as ex:
+        await interaction.followup.send(f'❌ Error: {ex}', ephemeral=True)
+
+
+@tree.command(name="fitleaderboard", description="Rank this server's public members")
+@app_commands.describe(metric="What to rank by")
+@app_commands.choices(metric=[app_commands.Choice(name=v, value=k) for k, v in LEADERBOARD_METRICS.items()])
+async def fitleaderboard(interaction: discord.Interaction, metric: app_commands.Choice[str] | None = None):
+    if interaction.guild is None:
+        await interaction.response.send_message('❌ Leaderboards are per server; run this in one.', ephemeral=True)
+        return
+    embed = build_leaderboard_embed(interaction.guild, metric.value if metric else 'progress')
+    await interaction.response.send_message(embed=embed, view=PublishView(embed=embed, guild=interaction.guild),
+                                            ephemeral=True)
 
 
 client.run(os.getenv('DISCORD_TOKEN'))